@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Bulk-import an existing library into Sonarr and/or Radarr via their APIs.
+
+Reads the unmapped folders of the root folder, resolves each folder name
+through the series/movie lookup endpoint with bounded concurrency, and adds
+the matches in batches through the bulk import endpoint without starting a
+search for each item. Lookup results are cached in
+~/.cache/hoth-os/library-lookup.json, so reruns only query folders that were
+not resolved before.
+
+Folder names are used as lookup terms; `Name (Year)` is matched against the
+year, and ID tags the app understands are looked up by ID: `{tvdb-123}` and
+`{imdb-tt123}` for Sonarr, `{tmdb-123}` and `{imdb-tt123}` for Radarr. Other
+tags are ignored and the title and year are used instead.
+
+Requirements:
+- Python 3.10+
+- requests (pip install requests)
+
+Usage examples:
+  # Show what would be imported into Sonarr
+  python import_library.py \
+    --sonarr-url http://localhost:8989 \
+    --sonarr-apikey <SONARR_API_KEY> \
+    --dry-run
+
+  # Import into both, eight lookups at a time
+  python import_library.py \
+    --sonarr-url http://localhost:8989 \
+    --sonarr-apikey <SONARR_API_KEY> \
+    --radarr-url http://localhost:7878 \
+    --radarr-apikey <RADARR_API_KEY> \
+    --jobs 8
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urljoin
+
+import requests
+
+CACHE_FILE = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    / "hoth-os"
+    / "library-lookup.json"
+)
+
+YEAR_RE = re.compile(r"\((\d{4})\)")
+ID_TAG_RE = re.compile(r"\{(tvdb|tmdb|imdb)-(\w+)\}")
+
+APPS = {
+    "sonarr": {
+        "resource": "series",
+        "id_key": "tvdbId",
+        # Folder ID tags the lookup endpoint accepts as "<type>:<id>"
+        "id_tags": ("tvdb", "imdb"),
+        "default_root": "/data/tv/",
+        "add_options": {"searchForMissingEpisodes": False, "monitor": "all"},
+        "extra": {"seasonFolder": True},
+    },
+    "radarr": {
+        "resource": "movie",
+        "id_key": "tmdbId",
+        "id_tags": ("tmdb", "imdb"),
+        "default_root": "/data/movies/",
+        "add_options": {"searchForMovie": False},
+        "extra": {},
+    },
+}
+
+
+def _headers(api_key: str) -> dict:
+    return {
+        "X-Api-Key": api_key,
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+    }
+
+
+def _get_json(url: str, headers: dict, verify: bool, params: dict | None = None):
+    r = requests.get(url, headers=headers, params=params, timeout=30, verify=verify)
+    if r.status_code >= 400:
+        raise RuntimeError(f"GET {url} failed: {r.status_code} {r.text}")
+    return r.json()
+
+
+def _post_json(url: str, headers: dict, payload, verify: bool):
+    r = requests.post(url, headers=headers, json=payload, timeout=120, verify=verify)
+    if r.status_code >= 400:
+        raise RuntimeError(f"POST {url} failed: {r.status_code} {r.text}")
+    return r.json()
+
+
+def _normalize_base_url(u: str) -> str:
+    return u.rstrip("/")
+
+
+class LookupCache:
+    """Folder name -> lookup result (None for no match), persisted as JSON."""
+
+    def __init__(self, path: Path = CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = json.loads(path.read_text()) if path.exists() else {}
+
+    def get(self, app: str, name: str):
+        return self.data.get(app, {}).get(name, ...)
+
+    def put(self, app: str, name: str, result) -> None:
+        with self.lock:
+            self.data.setdefault(app, {})[name] = result
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data))
+        tmp.replace(self.path)
+
+
+def id_tag(app: str, folder_name: str) -> str | None:
+    """Return the folder's first ID tag the app can look up, as "<type>:<id>"."""
+    for m in ID_TAG_RE.finditer(folder_name):
+        if m.group(1) in APPS[app]["id_tags"]:
+            return f"{m.group(1)}:{m.group(2)}"
+    return None
+
+
+def lookup_term(app: str, folder_name: str) -> str:
+    # Other apps' tags (e.g. tvdb for Radarr) would be searched as titles
+    return id_tag(app, folder_name) or ID_TAG_RE.sub("", folder_name).strip()
+
+
+def pick_match(app: str, folder_name: str, results: list) -> dict | None:
+    """Return the first result whose year agrees with the folder, if it has one."""
+    if not results:
+        return None
+    if id_tag(app, folder_name):
+        return results[0]
+    m = YEAR_RE.search(folder_name)
+    if not m:
+        return results[0]
+    year = int(m.group(1))
+    return next((r for r in results if abs(r.get("year", 0) - year) <= 1), None)
+
+
+def lookup(base_url: str, headers: dict, verify: bool, app: str, name: str):
+    results = _get_json(
+        urljoin(base_url + "/", f"api/v3/{APPS[app]['resource']}/lookup"),
+        headers,
+        verify,
+        params={"term": lookup_term(app, name)},
+    )
+    return pick_match(app, name, results)
+
+
+def get_root_folder(base_url: str, headers: dict, verify: bool, root_path: str) -> dict:
+    folders = _get_json(urljoin(base_url + "/", "api/v3/rootfolder"), headers, verify)
+    for folder in folders:
+        if folder.get("path", "").rstrip("/") == root_path.rstrip("/"):
+            # The list endpoint may leave out unmappedFolders; the single one has them
+            return _get_json(
+                urljoin(base_url + "/", f"api/v3/rootfolder/{folder['id']}"),
+                headers,
+                verify,
+            )
+    raise RuntimeError(f"Root folder {root_path} not found; run setup_root_folders.py first")
+
+
+def get_quality_profile_id(base_url: str, headers: dict, verify: bool, name: str | None) -> int:
+    profiles = _get_json(urljoin(base_url + "/", "api/v3/qualityprofile"), headers, verify)
+    if not profiles:
+        raise RuntimeError("No quality profiles found")
+    if name is None:
+        return profiles[0]["id"]
+    for p in profiles:
+        if p.get("name", "").lower() == name.lower():
+            return p["id"]
+    raise RuntimeError(f"Quality profile '{name}' not found")
+
+
+def get_language_profile_id(base_url: str, headers: dict, verify: bool) -> int | None:
+    # Sonarr v3 needs a language profile; v4 and Radarr do not have them
+    r = requests.get(
+        urljoin(base_url + "/", "api/v3/languageprofile"),
+        headers=headers,
+        timeout=15,
+        verify=verify,
+    )
+    if r.status_code >= 400 or not r.json():
+        return None
+    return r.json()[0]["id"]
+
+
+def import_app(app: str, base_url: str, api_key: str, args, cache: LookupCache) -> bool:
+    spec = APPS[app]
+    base_url = _normalize_base_url(base_url)
+    headers = _headers(api_key)
+    verify = not args.insecure
+    root_path = args.tv_path if app == "sonarr" else args.movies_path
+
+    root = get_root_folder(base_url, headers, verify, root_path)
+    folders = root.get("unmappedFolders", [])
+    print(f"{app}: {len(folders)} unmapped folders in {root['path']}")
+    if not folders:
+        return True
+
+    matches: dict[str, dict | None] = {}
+    pending = []
+    for folder in folders:
+        cached = cache.get(app, folder["name"])
+        if cached is ... or (cached is None and args.retry_misses):
+            pending.append(folder)
+        else:
+            matches[folder["name"]] = cached
+    print(f"{app}: {len(matches)} cached, {len(pending)} to look up ({args.jobs} at a time)")
+
+    failed_lookups = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {
+            pool.submit(lookup, base_url, headers, verify, app, f["name"]): f
+            for f in pending
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            name = futures[future]["name"]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Not cached, so the next run tries again
+                failed_lookups += 1
+                print(f"  Lookup failed for {name}: {e}", file=sys.stderr)
+                continue
+            matches[name] = result
+            cache.put(app, name, result)
+            if done % 50 == 0:
+                cache.save()
+                print(f"  {done}/{len(pending)} looked up")
+    cache.save()
+
+    quality_profile_id = get_quality_profile_id(base_url, headers, verify, args.quality_profile)
+    language_profile_id = (
+        get_language_profile_id(base_url, headers, verify) if app == "sonarr" else None
+    )
+    existing = {
+        item.get(spec["id_key"])
+        for item in _get_json(
+            urljoin(base_url + "/", f"api/v3/{spec['resource']}"), headers, verify
+        )
+    }
+
+    to_add = []
+    unmatched = []
+    for folder in folders:
+        match = matches.get(folder["name"])
+        if not match:
+            if folder["name"] in matches:
+                unmatched.append(folder["name"])
+            continue
+        item_id = match.get(spec["id_key"])
+        if item_id in existing:
+            print(f"  Skipping {folder['name']}: {match.get('title')} is already added")
+            continue
+        existing.add(item_id)
+
+        item = dict(match)
+        item.update(spec["extra"])
+        item.update(
+            {
+                "path": folder["path"],
+                "rootFolderPath": root["path"],
+                "qualityProfileId": quality_profile_id,
+                "monitored": True,
+                "addOptions": spec["add_options"],
+            }
+        )
+        if language_profile_id is not None:
+            item["languageProfileId"] = language_profile_id
+        to_add.append(item)
+
+    for name in unmatched:
+        print(f"  No match for {name}")
+
+    if args.dry_run:
+        for item in to_add:
+            print(f"  Would add {item.get('title')} ({item.get('year')}) from {item['path']}")
+    else:
+        import_url = urljoin(base_url + "/", f"api/v3/{spec['resource']}/import")
+        for start in range(0, len(to_add), args.batch_size):
+            batch = to_add[start : start + args.batch_size]
+            _post_json(import_url, headers, batch, verify)
+            print(f"  Added {start + len(batch)}/{len(to_add)}")
+
+    verb = "Would add" if args.dry_run else "Added"
+    print(
+        f"✓ {app}: {verb} {len(to_add)}, no match {len(unmatched)}, "
+        f"lookup errors {failed_lookups}"
+    )
+    return failed_lookups == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk-import an existing library into Sonarr and Radarr."
+    )
+    parser.add_argument(
+        "--sonarr-url",
+        help="Sonarr base URL (e.g., http://localhost:8989)",
+    )
+    parser.add_argument("--sonarr-apikey", help="Sonarr API key")
+    parser.add_argument(
+        "--radarr-url",
+        help="Radarr base URL (e.g., http://localhost:7878)",
+    )
+    parser.add_argument("--radarr-apikey", help="Radarr API key")
+    parser.add_argument(
+        "--tv-path",
+        default=APPS["sonarr"]["default_root"],
+        help="TV shows root folder path (default: /data/tv/)",
+    )
+    parser.add_argument(
+        "--movies-path",
+        default=APPS["radarr"]["default_root"],
+        help="Movies root folder path (default: /data/movies/)",
+    )
+    parser.add_argument(
+        "--quality-profile", help="Quality profile name (default: the first profile)"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=4, help="Concurrent lookups (default: 4)"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=50, help="Items per import request (default: 50)"
+    )
+    parser.add_argument(
+        "--retry-misses",
+        action="store_true",
+        help="Look up folders again that had no match last time",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Resolve and report without adding anything"
+    )
+    parser.add_argument(
+        "--insecure",
+        action="store_true",
+        help="Disable TLS verification (not recommended)",
+    )
+    args = parser.parse_args()
+
+    targets = []
+    if args.sonarr_url and args.sonarr_apikey:
+        targets.append(("sonarr", args.sonarr_url, args.sonarr_apikey))
+    if args.radarr_url and args.radarr_apikey:
+        targets.append(("radarr", args.radarr_url, args.radarr_apikey))
+    if not targets:
+        parser.error("Provide --sonarr-url/--sonarr-apikey and/or --radarr-url/--radarr-apikey")
+
+    cache = LookupCache()
+    ok = True
+    for app, url, api_key in targets:
+        try:
+            ok = import_app(app, url, api_key, args, cache) and ok
+        except Exception as e:
+            print(f"Error importing into {app}: {e}", file=sys.stderr)
+            ok = False
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
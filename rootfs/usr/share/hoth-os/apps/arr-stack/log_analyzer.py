@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Aggregate arr-stack log events per time window without loading whole logs.
+
+Log lines are streamed through a generator pipeline (source -> parse ->
+classify -> window) from the user journal, `podman logs` or log files, so
+memory use stays flat no matter how much journal is scanned. Sonarr, Radarr
+and Prowlarr lines (console `[Level] Component: message` and log file
+`date|Level|Component|message` formats) and qBittorrent lines (`(N) date -
+message`) are parsed and counted per service and window:
+
+- errors and warnings
+- slow HTTP calls (`(1234 ms)` suffixes, e.g. indexer queries) above --slow-ms
+- SQLite "database is locked" messages
+- import runs and their durations
+
+Requirements:
+- Python 3.10+
+
+Usage examples:
+  # Last 24 hours of the journal, in 15 minute windows
+  python log_analyzer.py --since "24 hours ago" --window 15
+
+  # Follow the journal and print each window as it closes
+  python log_analyzer.py --follow
+
+  # Read through podman logs instead of the journal; --since is resolved
+  # with `date -d`, so the same journalctl-style times work here
+  python log_analyzer.py --source podman --services sonarr,radarr --since "2 hours ago"
+
+  # Analyze Sonarr's own log files
+  python log_analyzer.py --source file /srv/config/sonarr/logs/sonarr*.txt
+"""
+
+import argparse
+import json
+import queue
+import re
+import subprocess
+import sys
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+
+SERVICES = ("sonarr", "radarr", "prowlarr", "qbittorrent")
+CONTAINER_PREFIX = "systemd-"
+
+# [Info] RssSyncService: RSS Sync Completed.
+ARR_CONSOLE_RE = re.compile(r"^\[(Trace|Debug|Info|Warn|Error|Fatal)\]\s+(\w+):\s?(.*)")
+# 2024-01-01 12:00:00.1|Info|RssSyncService|RSS Sync Completed.
+ARR_FILE_RE = re.compile(
+    r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})(?:\.\d+)?\|(\w+)\|(\w+)\|(.*)"
+)
+# (N) 2024-01-01T12:00:00 - Torrent added
+QBIT_RE = re.compile(r"^\(([NIWC])\)\s+(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})\s+-\s+(.*)")
+# 2024-01-01T12:00:00.123456789+00:00 <line>
+PODMAN_TS_RE = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.\d+)?(\S*)\s(.*)")
+
+QBIT_LEVELS = {"N": "Info", "I": "Info", "W": "Warn", "C": "Error"}
+HTTP_MS_RE = re.compile(r"\((\d+) ms\)")
+DB_LOCKED_RE = re.compile(r"database is locked", re.IGNORECASE)
+IMPORT_COMMAND_RE = re.compile(
+    r"(DownloadedEpisodesScan|DownloadedMoviesScan|ManualImport|ProcessMonitoredDownloads)"
+)
+# Command durations are logged as a TimeSpan, e.g. [00:00:12.3456789]
+TIMESPAN_RE = re.compile(r"\[(\d+):(\d{2}):(\d{2}(?:\.\d+)?)\]")
+
+
+@dataclass
+class LogLine:
+    ts: float
+    service: str
+    level: str
+    component: str
+    message: str
+
+
+@dataclass
+class WindowStats:
+    lines: int = 0
+    errors: int = 0
+    warnings: int = 0
+    slow_http: int = 0
+    slowest_ms: int = 0
+    db_locked: int = 0
+    imports: int = 0
+    import_seconds: float = 0.0
+    samples: list[str] = field(default_factory=list)
+
+
+# --- sources: yield (ts or None, service, raw line) ------------------------
+
+
+def journal_source(services: list[str], since: str | None, follow: bool):
+    cmd = ["journalctl", "--user", "-o", "json", "--no-pager"]
+    for service in services:
+        cmd += ["-u", f"{service}.service"]
+    if since:
+        cmd += ["--since", since]
+    if follow:
+        cmd += ["-f", "-n", "0"]
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    try:
+        for line in proc.stdout:
+            entry = json.loads(line)
+            message = entry.get("MESSAGE")
+            if not isinstance(message, str):
+                # Binary or multi-field messages are encoded as lists
+                continue
+            container = entry.get("CONTAINER_NAME", "")
+            unit = entry.get("_SYSTEMD_USER_UNIT", "")
+            service = container.removeprefix(CONTAINER_PREFIX) or unit.removesuffix(".service")
+            ts = int(entry.get("__REALTIME_TIMESTAMP", 0)) / 1e6
+            yield ts, service, message
+    finally:
+        proc.stdout.close()
+        proc.terminate()
+        proc.wait()
+
+
+def _podman_reader(service: str, since: str | None, follow: bool, out: queue.Queue):
+    cmd = ["podman", "logs", "--timestamps"]
+    if since:
+        cmd += ["--since", since]
+    if follow:
+        cmd += ["--follow", "--tail", "0"]
+    cmd.append(f"{CONTAINER_PREFIX}{service}")
+
+    proc = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    for line in proc.stdout:
+        m = PODMAN_TS_RE.match(line.rstrip("\n"))
+        if m:
+            ts = datetime.fromisoformat(m.group(1) + (m.group(2) or "")).timestamp()
+            out.put((ts, service, m.group(3)))
+        else:
+            out.put((None, service, line.rstrip("\n")))
+    proc.wait()
+    out.put(None)
+
+
+def podman_since(since: str) -> str:
+    """Resolve a journalctl-style time ('2 hours ago') to RFC3339 for podman."""
+    result = subprocess.run(
+        ["date", "-d", since, "--iso-8601=seconds"], capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Cannot parse --since {since!r}: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def podman_source(services: list[str], since: str | None, follow: bool):
+    # podman logs only takes timestamps and Go durations, so resolve it once
+    if since:
+        since = podman_since(since)
+    # One reader thread per container; the bounded queue keeps memory flat
+    out = queue.Queue(maxsize=1000)
+    for service in services:
+        threading.Thread(
+            target=_podman_reader, args=(service, since, follow, out), daemon=True
+        ).start()
+
+    remaining = len(services)
+    while remaining:
+        item = out.get()
+        if item is None:
+            remaining -= 1
+            continue
+        yield item
+
+
+def file_source(paths: list[str]):
+    for path in paths:
+        service = next((s for s in SERVICES if s in path.lower()), "unknown")
+        with open(path, errors="replace") as f:
+            for line in f:
+                yield None, service, line.rstrip("\n")
+
+
+# --- pipeline stages -------------------------------------------------------
+
+
+def parse(records):
+    """Turn raw lines into LogLines, carrying the last timestamp forward."""
+    last_ts = 0.0
+    for ts, service, raw in records:
+        if m := ARR_FILE_RE.match(raw):
+            ts = datetime.strptime(m.group(1), "%Y-%m-%d %H:%M:%S").timestamp()
+            level, component, message = m.group(2), m.group(3), m.group(4)
+        elif m := ARR_CONSOLE_RE.match(raw):
+            level, component, message = m.group(1), m.group(2), m.group(3)
+        elif m := QBIT_RE.match(raw):
+            ts = datetime.fromisoformat(m.group(2)).timestamp()
+            level, component, message = QBIT_LEVELS[m.group(1)], "qBittorrent", m.group(3)
+        else:
+            # Stack traces and other continuation lines
+            level, component, message = "", "", raw
+
+        if ts is None:
+            ts = last_ts
+        last_ts = ts
+        yield LogLine(ts, service, level, component, message)
+
+
+def classify(lines, slow_ms: int):
+    """Attach the events each line represents: (line, [(event, value), ...])."""
+    for line in lines:
+        events = []
+        if line.level in ("Error", "Fatal"):
+            events.append(("error", 1))
+        elif line.level == "Warn":
+            events.append(("warning", 1))
+
+        if m := HTTP_MS_RE.search(line.message):
+            ms = int(m.group(1))
+            if ms >= slow_ms:
+                events.append(("slow_http", ms))
+        if DB_LOCKED_RE.search(line.message):
+            events.append(("db_locked", 1))
+        if IMPORT_COMMAND_RE.search(line.message) and (m := TIMESPAN_RE.search(line.message)):
+            hours, minutes, seconds = m.groups()
+            events.append(("import", int(hours) * 3600 + int(minutes) * 60 + float(seconds)))
+        yield line, events
+
+
+def windows(classified, window_seconds: int, follow: bool):
+    """Aggregate per (window start, service); yield windows once they are closed."""
+    open_windows: dict[tuple[int, str], WindowStats] = {}
+    newest = 0
+    for line, events in classified:
+        start = int(line.ts // window_seconds * window_seconds)
+        stats = open_windows.setdefault((start, line.service), WindowStats())
+        stats.lines += 1
+        for event, value in events:
+            if event == "error":
+                stats.errors += 1
+                if len(stats.samples) < 3:
+                    stats.samples.append(f"{line.component}: {line.message}"[:160])
+            elif event == "warning":
+                stats.warnings += 1
+            elif event == "slow_http":
+                stats.slow_http += 1
+                stats.slowest_ms = max(stats.slowest_ms, value)
+            elif event == "db_locked":
+                stats.db_locked += 1
+            elif event == "import":
+                stats.imports += 1
+                stats.import_seconds += value
+
+        if follow and start > newest:
+            newest = start
+            for key in sorted(k for k in open_windows if k[0] < newest):
+                yield key, open_windows.pop(key)
+
+    for key in sorted(open_windows):
+        yield key, open_windows.pop(key)
+
+
+# --- output ----------------------------------------------------------------
+
+
+def _header() -> str:
+    return (
+        f"{'Window':<17}{'Service':<13}{'Lines':>7}{'Errors':>8}{'Warns':>7}"
+        f"{'SlowHTTP':>9}{'Slowest':>9}{'DBLock':>8}{'Imports':>8}{'AvgImport':>10}"
+    )
+
+
+def _row(label: str, service: str, s: WindowStats) -> str:
+    avg = f"{s.import_seconds / s.imports:.1f}s" if s.imports else "-"
+    slowest = f"{s.slowest_ms}ms" if s.slowest_ms else "-"
+    return (
+        f"{label:<17}{service:<13}"
+        f"{s.lines:>7}{s.errors:>8}{s.warnings:>7}{s.slow_http:>9}{slowest:>9}"
+        f"{s.db_locked:>8}{s.imports:>8}{avg:>10}"
+    )
+
+
+def report(windowed, show_samples: bool) -> None:
+    totals: dict[str, WindowStats] = {}
+    print(_header(), flush=True)
+    for (start, service), s in windowed:
+        label = datetime.fromtimestamp(start).strftime("%Y-%m-%d %H:%M")
+        print(_row(label, service, s), flush=True)
+        if show_samples:
+            for sample in s.samples:
+                print(f"    {sample}")
+
+        t = totals.setdefault(service, WindowStats())
+        t.lines += s.lines
+        t.errors += s.errors
+        t.warnings += s.warnings
+        t.slow_http += s.slow_http
+        t.slowest_ms = max(t.slowest_ms, s.slowest_ms)
+        t.db_locked += s.db_locked
+        t.imports += s.imports
+        t.import_seconds += s.import_seconds
+
+    if totals:
+        print()
+        print("Totals:")
+        for service, t in sorted(totals.items()):
+            print(_row("all", service, t))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Streaming log analyzer for the arr-stack pod."
+    )
+    parser.add_argument(
+        "files", nargs="*", help="Log files to read (with --source file)"
+    )
+    parser.add_argument(
+        "--source",
+        choices=("journal", "podman", "file"),
+        default="journal",
+        help="Where to read logs from (default: journal)",
+    )
+    parser.add_argument(
+        "--services",
+        default=",".join(SERVICES),
+        help=f"Comma-separated services (default: {','.join(SERVICES)})",
+    )
+    parser.add_argument(
+        "--since",
+        help="Only read entries since this time (e.g. '2 hours ago', '2024-01-01'; "
+        "not used for --source file)",
+    )
+    parser.add_argument(
+        "--follow", action="store_true", help="Follow new entries, printing each closed window"
+    )
+    parser.add_argument(
+        "--window", type=int, default=5, help="Window size in minutes (default: 5)"
+    )
+    parser.add_argument(
+        "--slow-ms",
+        type=int,
+        default=2000,
+        help="HTTP calls at or above this many ms count as slow (default: 2000)",
+    )
+    parser.add_argument(
+        "--samples", action="store_true", help="Print up to three error lines per window"
+    )
+    args = parser.parse_args()
+
+    services = [s.strip() for s in args.services.split(",") if s.strip()]
+    if args.source == "file":
+        if not args.files:
+            parser.error("--source file needs at least one log file")
+        if args.follow:
+            parser.error("--follow is not supported for --source file")
+        records = file_source(args.files)
+    elif args.source == "podman":
+        records = podman_source(services, args.since, args.follow)
+    else:
+        records = journal_source(services, args.since, args.follow)
+
+    pipeline = windows(
+        classify(parse(records), args.slow_ms), args.window * 60, args.follow
+    )
+    try:
+        report(pipeline, args.samples)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
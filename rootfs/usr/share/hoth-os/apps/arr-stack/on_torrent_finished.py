@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+qBittorrent "run on torrent finished" hook: defragment finished files in place.
+
+Torrent pieces arrive in random order, so files written into a copy-on-write
+btrfs directory end up in thousands of extents. For every file of the
+finished torrent this counts the physically separate extents (FIEMAP), and if
+there are more than --max-fragments-per-gib, defragments the file in place
+(BTRFS_IOC_DEFRAG_RANGE, like `btrfs filesystem defragment -t 128M`). The
+inode is kept, so hardlinks Sonarr/Radarr may already have made into the
+library share the rewritten data. Before and after counts are appended to
+the log next to this script.
+
+Incomplete downloads live in a NOCOW subvolume, so by the time this runs
+qBittorrent has already moved the files out of it; across subvolumes that
+move is a full copy, and this hook only defragments what is still fragmented.
+
+Installed to /config/hooks in the qBittorrent container and run as:
+  python3 /config/hooks/on_torrent_finished.py "%F"
+
+Requirements:
+- Python 3.10+
+
+Usage examples:
+  # Check and fix a finished download by hand
+  python on_torrent_finished.py /data/downloads/Some.Show.S01
+
+  # Only report extent counts
+  python on_torrent_finished.py --dry-run /data/downloads/movie.mkv
+"""
+
+import argparse
+import errno
+import fcntl
+import os
+import shutil
+import struct
+import sys
+import time
+from pathlib import Path
+
+LOG_FILE = Path(__file__).resolve().with_suffix(".log")
+
+# From <linux/fiemap.h>: _IOWR('f', 11, struct fiemap)
+FS_IOC_FIEMAP = 0xC020660B
+FIEMAP_FLAG_SYNC = 0x1
+FIEMAP_EXTENT_LAST = 0x1
+FIEMAP_HEADER = struct.Struct("=QQLLLL")
+FIEMAP_EXTENT = struct.Struct("=QQQQQLLLL")
+EXTENTS_PER_CALL = 512
+
+# From <linux/btrfs.h>: _IOW(0x94, 16, struct btrfs_ioctl_defrag_range_args)
+BTRFS_IOC_DEFRAG_RANGE = 0x40309410
+BTRFS_DEFRAG_RANGE_START_IO = 0x2
+DEFRAG_RANGE_ARGS = struct.Struct("=QQQLL16x")
+# Extents at least this large are left alone
+DEFRAG_EXTENT_THRESH = 128 * 1024 * 1024
+
+# Files smaller than this are not worth defragmenting
+MIN_SIZE = 16 * 1024 * 1024
+
+
+def count_fragments(path: Path) -> int:
+    """Return the number of physically discontiguous extents of the file."""
+    fragments = 0
+    next_physical = None
+    start = 0
+    with open(path, "rb") as f:
+        while True:
+            request = FIEMAP_HEADER.pack(
+                start, 2**64 - 1 - start, FIEMAP_FLAG_SYNC, 0, EXTENTS_PER_CALL, 0
+            )
+            buf = bytearray(request + bytes(FIEMAP_EXTENT.size * EXTENTS_PER_CALL))
+            fcntl.ioctl(f.fileno(), FS_IOC_FIEMAP, buf)
+            mapped = FIEMAP_HEADER.unpack_from(buf)[3]
+            if mapped == 0:
+                return fragments
+
+            last = False
+            for i in range(mapped):
+                logical, physical, length, _, _, flags, *_ = FIEMAP_EXTENT.unpack_from(
+                    buf, FIEMAP_HEADER.size + i * FIEMAP_EXTENT.size
+                )
+                # btrfs splits extents at 128 MiB; adjacent ones are one fragment
+                if physical != next_physical:
+                    fragments += 1
+                next_physical = physical + length
+                start = logical + length
+                last = bool(flags & FIEMAP_EXTENT_LAST)
+            if last:
+                return fragments
+
+
+def defragment(path: Path) -> None:
+    """Rewrite the file's extents contiguously without changing its inode."""
+    args = DEFRAG_RANGE_ARGS.pack(
+        0, 2**64 - 1, BTRFS_DEFRAG_RANGE_START_IO, DEFRAG_EXTENT_THRESH, 0
+    )
+    with open(path, "rb") as f:
+        fcntl.ioctl(f.fileno(), BTRFS_IOC_DEFRAG_RANGE, args)
+
+
+def torrent_files(content_path: Path):
+    if content_path.is_file():
+        yield content_path
+        return
+    for root, _dirs, files in os.walk(content_path):
+        for name in files:
+            f = Path(root) / name
+            if not f.is_symlink():
+                yield f
+
+
+def log(message: str) -> None:
+    line = f"{time.strftime('%Y-%m-%d %H:%M:%S')} {message}"
+    print(line)
+    try:
+        with open(LOG_FILE, "a") as f:
+            f.write(line + "\n")
+    except OSError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Defragment the files of a finished torrent in place."
+    )
+    parser.add_argument("content_path", type=Path, help="Torrent content path (%%F)")
+    parser.add_argument(
+        "--max-fragments-per-gib",
+        type=float,
+        default=16,
+        help="Defragment files with more fragments than this per GiB (default: 16)",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report fragment counts"
+    )
+    args = parser.parse_args()
+
+    try:
+        total_before = total_after = defragmented = 0
+        for f in torrent_files(args.content_path):
+            size = f.stat().st_size
+            if size < MIN_SIZE:
+                continue
+            before = count_fragments(f)
+            total_before += before
+            limit = max(4.0, size / 1024**3 * args.max_fragments_per_gib)
+            if before <= limit or args.dry_run:
+                total_after += before
+                log(f"{f.name}: {before} fragments, {size / 1024**2:.0f} MiB, left as is")
+                continue
+
+            # Copy-on-write needs room for the new extents before the old are freed
+            if shutil.disk_usage(f.parent).free < size * 1.1:
+                total_after += before
+                log(f"{f.name}: {before} fragments, not enough free space to defragment")
+                continue
+
+            start = time.monotonic()
+            try:
+                defragment(f)
+            except OSError as e:
+                if e.errno not in (errno.ENOTTY, errno.EOPNOTSUPP):
+                    raise
+                total_after += before
+                log(f"{f.name}: {before} fragments, not on btrfs, left as is")
+                continue
+            after = count_fragments(f)
+            total_after += after
+            defragmented += 1
+            log(
+                f"{f.name}: {before} -> {after} fragments, {size / 1024**2:.0f} MiB "
+                f"defragmented in {time.monotonic() - start:.1f}s"
+            )
+
+        log(
+            f"{args.content_path.name}: {defragmented} file(s) defragmented, "
+            f"fragments {total_before} -> {total_after}"
+        )
+
+    except Exception as e:
+        log(f"Error: {args.content_path}: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
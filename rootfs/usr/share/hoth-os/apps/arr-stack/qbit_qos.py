@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Throttle qBittorrent while Jellyfin is streaming and restore it afterwards.
+
+Polls Jellyfin's sessions API and, as soon as a session is playing, switches
+qBittorrent to its alternative speed limits and pauses torrents that are
+checking (hashing) so they stop competing for the disk. Normal operation is
+restored only after no stream has been active for the cooldown period, so a
+pause or a skip to the next episode does not flap the limits. Every throttled
+period is logged, and the running total is kept in
+~/.local/state/hoth-os/qbit-qos.json.
+
+Settings are read from ~/.config/hoth-os/qbit-qos.conf:
+
+  [jellyfin]
+  url = http://localhost:8096
+  api_key = <Jellyfin API key>
+
+  [qbittorrent]
+  url = http://localhost:8080
+  username = admin
+  password = <password>
+
+  [qos]
+  poll_seconds = 10
+  cooldown_seconds = 120
+  # Optional, applied to the alternative limits when throttling starts
+  alt_download_kib = 2048
+  alt_upload_kib = 512
+  pause_checking = true
+
+Requirements:
+- Python 3.10+
+- requests (pip install requests)
+
+Usage examples:
+  # Run in the foreground (the qbit-qos.service user unit runs this)
+  python qbit_qos.py run
+
+  # Show the total time spent throttled
+  python qbit_qos.py status
+"""
+
+import argparse
+import configparser
+import json
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urljoin
+
+import requests
+
+CONFIG_FILE = (
+    Path(os.environ.get("XDG_CONFIG_HOME", Path.home() / ".config"))
+    / "hoth-os"
+    / "qbit-qos.conf"
+)
+STATE_FILE = (
+    Path(os.environ.get("XDG_STATE_HOME", Path.home() / ".local" / "state"))
+    / "hoth-os"
+    / "qbit-qos.json"
+)
+
+DEFAULT_CONFIG = {
+    "jellyfin": {"url": "http://localhost:8096", "api_key": ""},
+    "qbittorrent": {"url": "http://localhost:8080", "username": "", "password": ""},
+    "qos": {
+        "poll_seconds": "10",
+        "cooldown_seconds": "120",
+        "alt_download_kib": "",
+        "alt_upload_kib": "",
+        "pause_checking": "true",
+    },
+}
+
+CHECKING_STATES = {"checkingDL", "checkingUP", "checkingResumeData"}
+
+
+def _normalize_base_url(u: str) -> str:
+    return u.rstrip("/")
+
+
+def load_config(path: Path = CONFIG_FILE) -> configparser.ConfigParser:
+    # Passwords and API keys may contain %, so no interpolation
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read_dict(DEFAULT_CONFIG)
+    parser.read(path)
+    return parser
+
+
+def load_state() -> dict:
+    if STATE_FILE.exists():
+        return json.loads(STATE_FILE.read_text())
+    return {"throttled_seconds": 0.0, "periods": 0}
+
+
+def save_state(state: dict) -> None:
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    STATE_FILE.write_text(json.dumps(state, indent=2) + "\n")
+
+
+class Jellyfin:
+    def __init__(self, section: configparser.SectionProxy):
+        self.url = _normalize_base_url(section["url"])
+        self.headers = {"X-Emby-Token": section["api_key"], "Accept": "application/json"}
+
+    def active_streams(self) -> int:
+        r = requests.get(
+            urljoin(self.url + "/", "Sessions"),
+            headers=self.headers,
+            params={"activeWithinSeconds": 300},
+            timeout=10,
+        )
+        if r.status_code >= 400:
+            raise RuntimeError(f"GET /Sessions failed: {r.status_code} {r.text}")
+        return sum(
+            1
+            for s in r.json()
+            if s.get("NowPlayingItem") and not s.get("PlayState", {}).get("IsPaused")
+        )
+
+
+class QBittorrent:
+    def __init__(self, section: configparser.SectionProxy):
+        self.url = _normalize_base_url(section["url"])
+        self.username = section["username"]
+        self.password = section["password"]
+        self.session = requests.Session()
+        self.logged_in = False
+
+    def _login(self) -> None:
+        r = self.session.post(
+            urljoin(self.url + "/", "api/v2/auth/login"),
+            data={"username": self.username, "password": self.password},
+            headers={"Referer": self.url},
+            timeout=10,
+        )
+        if r.status_code >= 400 or r.text.strip() == "Fails.":
+            raise RuntimeError("qBittorrent login failed")
+        self.logged_in = True
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        if not self.logged_in and self.username:
+            self._login()
+        url = urljoin(self.url + "/", f"api/v2/{path}")
+        r = self.session.request(method, url, timeout=10, **kwargs)
+        if r.status_code == 403 and self.username:
+            # Session cookie expired, e.g. after a qBittorrent restart
+            self._login()
+            r = self.session.request(method, url, timeout=10, **kwargs)
+        return r
+
+    def _call(self, method: str, path: str, **kwargs) -> requests.Response:
+        r = self._request(method, path, **kwargs)
+        if r.status_code >= 400:
+            raise RuntimeError(f"{method} {path} failed: {r.status_code} {r.text}")
+        return r
+
+    def alt_limits_enabled(self) -> bool:
+        return self._call("GET", "transfer/speedLimitsMode").text.strip() == "1"
+
+    def toggle_alt_limits(self) -> None:
+        self._call("POST", "transfer/toggleSpeedLimitsMode")
+
+    def set_alt_limits(self, download_kib: str, upload_kib: str) -> None:
+        prefs = {}
+        if download_kib:
+            prefs["alt_dl_limit"] = int(download_kib) * 1024
+        if upload_kib:
+            prefs["alt_up_limit"] = int(upload_kib) * 1024
+        if prefs:
+            self._call("POST", "app/setPreferences", data={"json": json.dumps(prefs)})
+
+    def checking_hashes(self) -> list[str]:
+        torrents = self._call("GET", "torrents/info").json()
+        return [t["hash"] for t in torrents if t.get("state") in CHECKING_STATES]
+
+    def _torrent_action(self, new: str, old: str, hashes: list[str]) -> None:
+        # qBittorrent 5 renamed pause/resume to stop/start
+        data = {"hashes": "|".join(hashes)}
+        r = self._request("POST", f"torrents/{new}", data=data)
+        if r.status_code == 404:
+            r = self._request("POST", f"torrents/{old}", data=data)
+        if r.status_code >= 400:
+            raise RuntimeError(f"torrents/{new} failed: {r.status_code} {r.text}")
+
+    def pause(self, hashes: list[str]) -> None:
+        self._torrent_action("stop", "pause", hashes)
+
+    def resume(self, hashes: list[str]) -> None:
+        self._torrent_action("start", "resume", hashes)
+
+
+class QoS:
+    def __init__(self, config: configparser.ConfigParser):
+        self.qos = config["qos"]
+        self.jellyfin = Jellyfin(config["jellyfin"])
+        self.qbit = QBittorrent(config["qbittorrent"])
+        self.cooldown = self.qos.getfloat("cooldown_seconds")
+        self.pause_checking = self.qos.getboolean("pause_checking")
+        self.state = load_state()
+
+        self.throttled_since: float | None = None
+        self.last_stream: float = 0.0
+        # Whether we turned the alt limits on, so we never undo a user's choice
+        self.toggled = False
+        self.paused_hashes: set[str] = set()
+
+    def throttle(self, streams: int) -> None:
+        print(f"{streams} stream(s) active, throttling qBittorrent", flush=True)
+        self.throttled_since = time.monotonic()
+        self.qbit.set_alt_limits(self.qos["alt_download_kib"], self.qos["alt_upload_kib"])
+        if not self.qbit.alt_limits_enabled():
+            self.qbit.toggle_alt_limits()
+            self.toggled = True
+
+    def pause_new_checks(self) -> None:
+        hashes = [h for h in self.qbit.checking_hashes() if h not in self.paused_hashes]
+        if hashes:
+            print(f"Pausing {len(hashes)} checking torrent(s)", flush=True)
+            self.qbit.pause(hashes)
+            self.paused_hashes.update(hashes)
+
+    def restore(self) -> None:
+        if self.toggled and self.qbit.alt_limits_enabled():
+            self.qbit.toggle_alt_limits()
+        self.toggled = False
+        if self.paused_hashes:
+            print(f"Resuming {len(self.paused_hashes)} torrent(s)", flush=True)
+            self.qbit.resume(sorted(self.paused_hashes))
+            self.paused_hashes.clear()
+
+        period = time.monotonic() - self.throttled_since
+        self.throttled_since = None
+        self.state["throttled_seconds"] += period
+        self.state["periods"] += 1
+        save_state(self.state)
+        print(
+            f"Restored normal limits after {period / 60:.1f} min throttled "
+            f"({self.state['throttled_seconds'] / 3600:.1f} h in total)",
+            flush=True,
+        )
+
+    def step(self) -> None:
+        streams = self.jellyfin.active_streams()
+        now = time.monotonic()
+        if streams:
+            self.last_stream = now
+            if self.throttled_since is None:
+                self.throttle(streams)
+            if self.pause_checking:
+                self.pause_new_checks()
+        elif self.throttled_since is not None and now - self.last_stream >= self.cooldown:
+            self.restore()
+
+    def run(self) -> None:
+        poll = self.qos.getfloat("poll_seconds")
+        while True:
+            try:
+                self.step()
+            except (requests.RequestException, RuntimeError) as e:
+                # Either service may be restarting; keep the current state
+                print(f"Warning: {e}", file=sys.stderr, flush=True)
+            time.sleep(poll)
+
+
+def cmd_run(args) -> None:
+    config = load_config()
+    if not config["jellyfin"]["api_key"]:
+        raise RuntimeError(f"Set [jellyfin] api_key in {CONFIG_FILE}")
+    qos = QoS(config)
+
+    def stop(signum, frame):
+        if qos.throttled_since is not None:
+            try:
+                qos.restore()
+            except (requests.RequestException, RuntimeError) as e:
+                print(f"Warning: could not restore qBittorrent: {e}", file=sys.stderr)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Watching Jellyfin at {qos.jellyfin.url}", flush=True)
+    qos.run()
+
+
+def cmd_status(args) -> None:
+    state = load_state()
+    print(
+        f"Throttled {state['periods']} times, "
+        f"{state['throttled_seconds'] / 3600:.1f} h in total"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Throttle qBittorrent while Jellyfin is streaming."
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("run", help="Poll and throttle until stopped")
+    sub.add_parser("status", help="Show the total time spent throttled")
+    args = parser.parse_args()
+
+    try:
+        if args.cmd == "run":
+            cmd_run(args)
+        elif args.cmd == "status":
+            cmd_status(args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
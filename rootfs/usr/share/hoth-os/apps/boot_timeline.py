@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Show how long each quadlet-managed service takes from boot to ready.
+
+Reads the user journal (`journalctl --user -o json`) as a stream and picks out
+systemd job messages and podman events (image pull, container create, start
+and health_status) for every installed quadlet. Builds a per-service timeline
+of image, create, start and healthy phases, prints the critical path to the
+last ready service and how much time was spent waiting on health checks, and
+suggests HealthStartPeriod and check interval values from what was measured.
+
+Requirements:
+- Python 3.10+
+- journald with podman's journald events logger (the default)
+
+Usage examples:
+  # Analyze the current boot
+  python boot_timeline.py
+
+  # Analyze the previous boot
+  python boot_timeline.py --boot -1
+
+  # Analyze a saved export
+  journalctl --user -b -o json > boot.json
+  python boot_timeline.py --input boot.json
+"""
+
+import argparse
+import json
+import math
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from resource_profile import DEFAULT_QUADLET_DIR as QUADLET_DIR
+
+# systemd catalog IDs for "Starting <unit>..." and "Started <unit>."
+MSG_UNIT_STARTING = "7d4958e842da4a758f6c1cdc7b36dcc5"
+MSG_UNIT_STARTED = "39f53479d3a045ac8e11786248231fbf"
+
+DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|us|s|m|h)")
+DURATION_UNITS = {"us": 1e-6, "ms": 1e-3, "s": 1, "m": 60, "h": 3600}
+
+
+@dataclass
+class Service:
+    unit: str
+    container: str | None = None
+    image: str | None = None
+    pod_unit: str | None = None
+    health: dict[str, str] = field(default_factory=dict)
+    starting: float | None = None
+    pulled: float | None = None
+    created: float | None = None
+    started: float | None = None
+    healthy: float | None = None
+    ready: float | None = None
+    health_checks: list[tuple[float, str]] = field(default_factory=list)
+
+
+def parse_duration(value: str) -> float | None:
+    matches = DURATION_RE.findall(value)
+    if not matches:
+        return None
+    return sum(float(n) * DURATION_UNITS[u] for n, u in matches)
+
+
+def _read_quadlet(path: Path) -> dict[str, str]:
+    keys = {}
+    for line in path.read_text().splitlines():
+        key, sep, value = line.partition("=")
+        if sep and not line.startswith(("#", ";", "[")):
+            keys[key.strip()] = value.strip()
+    return keys
+
+
+def load_services(quadlet_dir: Path) -> dict[str, Service]:
+    """Build one Service per installed .pod and .container quadlet, keyed by unit."""
+    services = {}
+    for path in sorted(quadlet_dir.glob("*.pod")):
+        unit = f"{path.stem}-pod.service"
+        services[unit] = Service(unit)
+
+    for path in sorted(quadlet_dir.glob("*.container")):
+        keys = _read_quadlet(path)
+        unit = f"{path.stem}.service"
+        pod = keys.get("Pod")
+        services[unit] = Service(
+            unit,
+            container=keys.get("ContainerName", f"systemd-{path.stem}"),
+            image=keys.get("Image"),
+            pod_unit=f"{Path(pod).stem}-pod.service" if pod else None,
+            health={k: v for k, v in keys.items() if k.startswith("Health") or k == "Notify"},
+        )
+    return services
+
+
+def journal_entries(boot: str, input_path: str | None):
+    """Yield journal entries one at a time without loading the whole journal."""
+    if input_path:
+        f = sys.stdin if input_path == "-" else open(input_path)
+        with f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    cmd = ["journalctl", "--user", "-b", boot, "-o", "json", "--no-pager"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    try:
+        for line in proc.stdout:
+            yield json.loads(line)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def collect(entries, services: dict[str, Service]) -> float | None:
+    """Fill in the service timelines and return the timestamp of the first entry."""
+    by_container = {s.container: s for s in services.values() if s.container}
+    by_image = {}
+    for s in services.values():
+        if s.image:
+            by_image.setdefault(s.image, []).append(s)
+
+    t0 = None
+    for entry in entries:
+        ts = int(entry.get("__REALTIME_TIMESTAMP", 0)) / 1e6
+        if t0 is None:
+            t0 = ts
+
+        unit = entry.get("USER_UNIT") or entry.get("UNIT")
+        message_id = entry.get("MESSAGE_ID")
+        if unit in services and message_id:
+            s = services[unit]
+            if message_id == MSG_UNIT_STARTING:
+                s.starting = ts
+            elif message_id == MSG_UNIT_STARTED and entry.get("JOB_RESULT", "done") == "done":
+                s.ready = ts
+            continue
+
+        event = entry.get("PODMAN_EVENT")
+        if not event:
+            continue
+        if entry.get("PODMAN_TYPE") == "image" and event == "pull":
+            for s in by_image.get(entry.get("PODMAN_NAME"), []):
+                s.pulled = ts
+            continue
+
+        s = by_container.get(entry.get("PODMAN_NAME"))
+        if s is None:
+            continue
+        if event == "create":
+            # A restart creates a new container; start the timeline over
+            s.created, s.started, s.healthy = ts, None, None
+            s.health_checks = []
+        elif event == "start":
+            s.started = ts
+        elif event == "health_status":
+            status = entry.get("PODMAN_HEALTH_STATUS", "")
+            if s.started and s.healthy is None:
+                s.health_checks.append((ts, status))
+                if status == "healthy":
+                    s.healthy = ts
+    return t0
+
+
+def phases(s: Service, t0: float) -> list[tuple[str, float]]:
+    """Return (phase, seconds) pairs for the service's path to ready."""
+    begin = s.starting or s.created
+    if begin is None:
+        return []
+    out = [("wait", max(0.0, begin - t0))]
+    cursor = begin
+    if s.pulled and s.pulled >= begin:
+        out.append(("image", s.pulled - cursor))
+        cursor = s.pulled
+    for name, ts in (("create", s.created), ("start", s.started), ("healthy", s.healthy)):
+        if ts and ts >= cursor:
+            out.append((name, ts - cursor))
+            cursor = ts
+    if s.ready and s.ready > cursor:
+        out.append(("ready", s.ready - cursor))
+    return out
+
+
+def ready_time(s: Service) -> float | None:
+    return s.ready or s.healthy or s.started
+
+
+def _fmt(seconds: float | None) -> str:
+    return "-" if seconds is None else f"{seconds:.1f}s"
+
+
+def print_timeline(services: dict[str, Service], t0: float) -> None:
+    print(
+        f"{'Unit':<26}{'Begin':>8}{'Image':>8}{'Create':>8}{'Start':>8}"
+        f"{'Healthy':>9}{'Ready':>8}{'Checks':>8}"
+    )
+
+    def rel(ts: float | None) -> float | None:
+        return None if ts is None else ts - t0
+
+    for s in sorted(services.values(), key=lambda s: ready_time(s) or math.inf):
+        if not (s.starting or s.created):
+            continue
+        print(
+            f"{s.unit:<26}{_fmt(rel(s.starting or s.created)):>8}{_fmt(rel(s.pulled)):>8}"
+            f"{_fmt(rel(s.created)):>8}{_fmt(rel(s.started)):>8}{_fmt(rel(s.healthy)):>9}"
+            f"{_fmt(rel(ready_time(s))):>8}{len(s.health_checks):>8}"
+        )
+
+
+def print_critical_path(services: dict[str, Service], t0: float) -> None:
+    ready = [s for s in services.values() if ready_time(s)]
+    if not ready:
+        print("No quadlet-managed unit became ready in this boot")
+        return
+
+    last = max(ready, key=ready_time)
+    chain = [last]
+    if last.pod_unit in services:
+        chain.insert(0, services[last.pod_unit])
+
+    print(f"Critical path ({_fmt(ready_time(last) - t0)} to {last.unit}):")
+    # Each link waits from the moment the previous one became ready
+    previous = t0
+    for s in chain:
+        for name, seconds in phases(s, previous):
+            if seconds > 0:
+                print(f"  {s.unit:<26}{name:<9}{_fmt(seconds):>8}")
+        previous = ready_time(s) or previous
+
+
+def print_health_advice(services: dict[str, Service]) -> None:
+    checked = [s for s in services.values() if s.started and s.healthy]
+    if not checked:
+        return
+
+    print("Health check waits:")
+    for s in sorted(checked, key=lambda s: s.unit):
+        to_healthy = s.healthy - s.started
+        failed = [ts for ts, status in s.health_checks if status != "healthy"]
+        # Time between the last failing check and the passing one is the
+        # most the service sat ready but not yet reported healthy
+        slack = s.healthy - failed[-1] if failed else 0.0
+
+        # HealthStartupInterval only applies while a HealthStartupCmd is running
+        interval_key = (
+            "HealthStartupInterval" if "HealthStartupCmd" in s.health else "HealthInterval"
+        )
+        current_key = interval_key if s.health.get(interval_key) else "HealthInterval"
+        interval = s.health.get(current_key, "")
+        start_period = s.health.get("HealthStartPeriod", "")
+        period_seconds = parse_duration(start_period)
+        note = ""
+        if period_seconds is not None and period_seconds < to_healthy:
+            note = " (start period ends before the service is healthy)"
+        suggest_period = 5 * math.ceil(to_healthy * 1.25 / 5)
+        suggest_interval = min(30, max(2, round(to_healthy / 10)))
+
+        print(
+            f"  {s.unit}: healthy {_fmt(to_healthy)} after start, "
+            f"{len(failed)} failed checks, up to {_fmt(slack)} lost to the check interval"
+        )
+        print(
+            f"    current HealthStartPeriod={start_period or '-'} "
+            f"{current_key}={interval or '-'}; "
+            f"suggested HealthStartPeriod={suggest_period}s "
+            f"{interval_key}={suggest_interval}s{note}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Boot-to-ready timeline and critical path for quadlet services."
+    )
+    parser.add_argument(
+        "--boot",
+        default="0",
+        help="Boot to analyze, as accepted by journalctl -b (default: 0, current boot)",
+    )
+    parser.add_argument(
+        "--input", help="Read a `journalctl -o json` export instead (use - for stdin)"
+    )
+    parser.add_argument(
+        "--quadlet-dir",
+        type=Path,
+        default=QUADLET_DIR,
+        help=f"Installed quadlet directory (default: {QUADLET_DIR})",
+    )
+    args = parser.parse_args()
+
+    try:
+        services = load_services(args.quadlet_dir)
+        if not services:
+            print(f"No installed quadlets found in {args.quadlet_dir}")
+            return
+
+        t0 = collect(journal_entries(args.boot, args.input), services)
+        if t0 is None:
+            print("No journal entries found")
+            return
+
+        print_timeline(services, t0)
+        print()
+        print_critical_path(services, t0)
+        print()
+        print_health_advice(services)
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
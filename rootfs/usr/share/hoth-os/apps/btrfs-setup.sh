@@ -83,6 +83,9 @@ else
     gum style --foreground 212 "  ✓ Created @snapshots"
 fi
 
+# Incomplete torrent downloads get their own NOCOW subvolume inside @data
+sudo bash /usr/share/hoth-os/apps/nocow-subvolume.sh "$MOUNT_POINT/@data/downloads/incomplete"
+
 echo
 
 UUID=$(sudo blkid -s UUID -o value "$DEVICE")
@@ -157,6 +160,7 @@ if gum confirm "Apply configuration now (add systemd mount units and mount)?"; t
     gum style --faint "Mounted at:"
     gum style --faint "  /var/srv/config (config & databases, with snapshots)"
     gum style --faint "  /var/srv/data (media & downloads, no snapshots)"
+    gum style --faint "  /var/srv/data/downloads/incomplete (NOCOW, for torrents in progress)"
     gum style --faint "  /var/srv/.snapshots (snapshot storage)"
     echo
     gum style --faint "For automatic snapshots, see BTRFS.md"
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Apply and report a per-directory btrfs compression policy for /srv/data.
+
+@data is mounted with compress=zstd:3, but most of it is already-compressed
+video where every compression attempt costs Pi CPU and saves nothing. This
+sets the btrfs `compression` property per directory (inherited by new files):
+off for media libraries and downloads, zstd for Jellyfin metadata and
+Syncthing data. The report shows the actual on-disk ratio of each directory
+(via compsize when installed, otherwise by sampling files) and the CPU time
+zstd:3 would spend on the directory's data.
+
+Requirements:
+- Python 3.10+
+- btrfs-progs, zstd
+- compsize (optional, for exact on-disk accounting)
+
+Usage examples:
+  # Set the properties on every existing policy directory
+  sudo python btrfs_compression.py apply
+
+  # Same, for a non-default base path
+  sudo python btrfs_compression.py apply --data-root /mnt/media/data
+
+  # Show ratios and CPU cost per directory, sampling up to 64 MiB each
+  sudo python btrfs_compression.py report --sample-mib 64
+"""
+
+import argparse
+import configparser
+import os
+import re
+import resource
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+DEFAULT_DATA_ROOT = "/var/srv/data"
+POLICY_CONFIG_FILE = "/etc/hoth-os/btrfs-compression.conf"
+
+# Directory (relative to the data root) -> btrfs compression property value
+DEFAULT_POLICY = {
+    "movies": "none",
+    "tv": "none",
+    "downloads": "none",
+    "jellyfin": "zstd",
+    "syncthing": "zstd",
+}
+
+SAMPLE_CHUNK = 1024 * 1024
+COMPSIZE_TOTAL_RE = re.compile(r"^TOTAL\s+(\d+)%\s+(\S+)\s+(\S+)\s+(\S+)", re.MULTILINE)
+SIZE_SUFFIXES = {"B": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def load_policy(path: str = POLICY_CONFIG_FILE) -> dict[str, str]:
+    # Values are read as written; % has no special meaning
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(path)
+    policy = dict(DEFAULT_POLICY)
+    if parser.has_section("policy"):
+        policy.update(parser["policy"])
+    return policy
+
+
+def is_btrfs(path: Path) -> bool:
+    out = subprocess.run(
+        ["stat", "-f", "-c", "%T", str(path)], capture_output=True, text=True
+    )
+    return out.returncode == 0 and out.stdout.strip() == "btrfs"
+
+
+def get_property(path: Path) -> str:
+    out = subprocess.run(
+        ["btrfs", "property", "get", str(path), "compression"],
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    # Prints "compression=zstd", or nothing when the mount option applies
+    return out.partition("=")[2] or "(mount default)"
+
+
+def set_property(path: Path, value: str) -> None:
+    subprocess.run(
+        ["btrfs", "property", "set", str(path), "compression", value], check=True
+    )
+
+
+def policy_dirs(data_root: Path, policy: dict[str, str]):
+    for rel, value in policy.items():
+        path = data_root / rel
+        if path.is_dir():
+            yield path, value
+
+
+def _parse_size(value: str) -> int:
+    if value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+
+def compsize(path: Path) -> tuple[int, int] | None:
+    """Return (disk_bytes, uncompressed_bytes) from compsize, if available."""
+    if not shutil.which("compsize"):
+        return None
+    out = subprocess.run(
+        ["compsize", "-x", str(path)], capture_output=True, text=True
+    ).stdout
+    m = COMPSIZE_TOTAL_RE.search(out)
+    if not m:
+        return None
+    return _parse_size(m.group(2)), _parse_size(m.group(3))
+
+
+def sample_files(path: Path, limit: int):
+    """Yield (file, bytes to read) across the tree until limit bytes are covered."""
+    remaining = limit
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            f = Path(root) / name
+            if not f.is_file() or f.is_symlink():
+                continue
+            take = min(remaining, f.stat().st_size, 8 * SAMPLE_CHUNK)
+            if take <= 0:
+                continue
+            yield f, take
+            remaining -= take
+            if remaining <= 0:
+                return
+
+
+def sample_zstd(path: Path, limit: int) -> tuple[int, int, float]:
+    """Compress a sample with zstd -3; return (input, output bytes, CPU seconds)."""
+    if not shutil.which("zstd"):
+        return 0, 0, 0.0
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    total_in = total_out = 0
+    for f, take in sample_files(path, limit):
+        proc = subprocess.Popen(
+            ["zstd", "-3", "-q", "-c"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        with open(f, "rb") as src:
+            data = src.read(take)
+        out, _ = proc.communicate(data)
+        total_in += len(data)
+        total_out += len(out)
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    return total_in, total_out, cpu
+
+
+def du_bytes(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                st = os.lstat(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+            total += st.st_size
+    return total
+
+
+def _fmt_bytes(n: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if n < 1024 or unit == "TiB":
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TiB"
+
+
+def cmd_apply(args) -> None:
+    data_root = Path(args.data_root)
+    if not is_btrfs(data_root):
+        print(f"{data_root} is not on btrfs, nothing to do")
+        return
+    for path, value in policy_dirs(data_root, load_policy()):
+        if get_property(path) == value:
+            print(f"  {path}: compression={value} (unchanged)")
+            continue
+        set_property(path, value)
+        print(f"✓ {path}: compression={value}")
+
+
+def cmd_report(args) -> None:
+    data_root = Path(args.data_root)
+    if not is_btrfs(data_root):
+        print(f"{data_root} is not on btrfs")
+        return
+
+    limit = args.sample_mib * 1024 * 1024
+    total_saved_cpu = 0.0
+    for path, value in policy_dirs(data_root, load_policy()):
+        size = du_bytes(path)
+        sample_in, sample_out, cpu = sample_zstd(path, limit)
+        print(f"{path}")
+        print(f"  policy: {value}, current property: {get_property(path)}")
+        print(f"  data: {_fmt_bytes(size)}")
+
+        disk = compsize(path)
+        if disk and disk[1]:
+            print(
+                f"  on disk: {_fmt_bytes(disk[0])} for {_fmt_bytes(disk[1])} "
+                f"uncompressed ({100 * disk[0] / disk[1]:.0f}%)"
+            )
+
+        if sample_in:
+            cpu_per_gib = cpu / sample_in * 1024**3
+            cpu_total = cpu / sample_in * size
+            print(
+                f"  zstd:3 sample: {_fmt_bytes(sample_in)} -> {_fmt_bytes(sample_out)} "
+                f"({100 * sample_out / sample_in:.0f}%), {cpu_per_gib:.1f} CPU s/GiB"
+            )
+            if value == "none":
+                total_saved_cpu += cpu_total
+                print(f"  CPU not spent compressing this data: ~{cpu_total:.0f} s")
+        print()
+
+    if total_saved_cpu:
+        print(f"Total CPU saved by the policy for existing data: ~{total_saved_cpu:.0f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-directory btrfs compression policy for /srv/data."
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    a = sub.add_parser("apply", help="Set the compression property per directory")
+    a.add_argument(
+        "--data-root",
+        default=DEFAULT_DATA_ROOT,
+        help=f"Data subvolume mount point (default: {DEFAULT_DATA_ROOT})",
+    )
+
+    r = sub.add_parser("report", help="Show compression ratios and CPU cost")
+    r.add_argument(
+        "--data-root",
+        default=DEFAULT_DATA_ROOT,
+        help=f"Data subvolume mount point (default: {DEFAULT_DATA_ROOT})",
+    )
+    r.add_argument(
+        "--sample-mib",
+        type=int,
+        default=32,
+        help="MiB to sample per directory for the zstd estimate (default: 32)",
+    )
+    args = parser.parse_args()
+
+    try:
+        if args.cmd == "apply":
+            cmd_apply(args)
+        elif args.cmd == "report":
+            cmd_report(args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
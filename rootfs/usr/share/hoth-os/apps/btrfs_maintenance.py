@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Run btrfs scrub and a filtered balance on the /srv volume only while it is idle.
+
+Started by srv-btrfs-maintenance.timer. Each run checks which tasks are due
+(scrub every scrub_interval_days, balance every balance_interval_days) and
+runs them while nothing else needs the disk. The system counts as busy when
+Jellyfin has a session playing something, qBittorrent transfers faster than
+a threshold, or the disk sees more I/O than a threshold beyond what the
+scrub itself reads. A scrub is cancelled as soon as the system gets busy and
+resumed from the same position once it is idle again; a balance is paused
+and resumed the same way. Progress and throughput are recorded in
+/var/lib/hoth-os/btrfs-maintenance.json.
+
+Requirements:
+- Python 3.10+
+- btrfs-progs (run as root)
+
+Usage examples:
+  # What the timer runs
+  sudo python btrfs_maintenance.py run
+
+  # Scrub now regardless of the interval, still waiting for idle
+  sudo python btrfs_maintenance.py run --force scrub
+
+  # Show the last runs
+  sudo python btrfs_maintenance.py status
+"""
+
+import argparse
+import configparser
+import http.cookiejar
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+
+CONFIG_FILE = "/etc/hoth-os/btrfs-maintenance.conf"
+STATE_FILE = Path("/var/lib/hoth-os/btrfs-maintenance.json")
+HISTORY_LENGTH = 20
+
+DEFAULT_CONFIG = {
+    "maintenance": {
+        "mount": "/var/srv/config",
+        "scrub_interval_days": "30",
+        "balance_interval_days": "7",
+        # Only rewrite block groups at most this % full
+        "balance_usage": "20",
+        "max_runtime_minutes": "240",
+        "poll_seconds": "30",
+    },
+    "idle": {
+        "disk_mib_s": "20",
+        "qbittorrent_kib_s": "1024",
+    },
+    "jellyfin": {"url": "http://localhost:8096", "api_key": ""},
+    "qbittorrent": {"url": "http://localhost:8080", "username": "", "password": ""},
+}
+
+SCRUB_STATUS_RE = re.compile(r"^Status:\s+(\w+)", re.MULTILINE)
+SCRUB_BYTES_RE = re.compile(r"^\s*(data|tree)_bytes_scrubbed:\s*(\d+)", re.MULTILINE)
+
+
+@dataclass
+class Busy:
+    reason: str = ""
+
+    def __bool__(self) -> bool:
+        return bool(self.reason)
+
+
+def load_config(path: str = CONFIG_FILE) -> configparser.ConfigParser:
+    # Passwords may contain %, so no interpolation
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read_dict(DEFAULT_CONFIG)
+    parser.read(path)
+    return parser
+
+
+def load_state() -> dict:
+    if STATE_FILE.exists():
+        return json.loads(STATE_FILE.read_text())
+    return {"last": {}, "history": []}
+
+
+def save_state(state: dict) -> None:
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    state["history"] = state["history"][-HISTORY_LENGTH:]
+    STATE_FILE.write_text(json.dumps(state, indent=2) + "\n")
+
+
+def _btrfs(*args: str, check: bool = True) -> subprocess.CompletedProcess:
+    return subprocess.run(["btrfs", *args], capture_output=True, text=True, check=check)
+
+
+# --- busy checks -----------------------------------------------------------
+
+
+def block_device(mount: str) -> str:
+    """Return the /proc/diskstats name of the device behind the mount."""
+    source = subprocess.run(
+        ["findmnt", "-n", "-o", "SOURCE", "--target", mount],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    # Subvolume mounts show up as /dev/sda1[/@config]
+    source = source.split("[", 1)[0]
+    return Path(os.path.realpath(source)).name
+
+
+def disk_bytes(device: str) -> int:
+    with open("/proc/diskstats") as f:
+        for line in f:
+            fields = line.split()
+            if fields[2] == device:
+                # Sectors read and written, always 512 bytes in diskstats
+                return (int(fields[5]) + int(fields[9])) * 512
+    raise RuntimeError(f"{device} not found in /proc/diskstats")
+
+
+def jellyfin_playing(section: configparser.SectionProxy) -> int:
+    if not section["api_key"]:
+        return 0
+    req = urllib.request.Request(
+        f"{section['url'].rstrip('/')}/Sessions?activeWithinSeconds=120",
+        headers={"X-Emby-Token": section["api_key"]},
+    )
+    with urllib.request.urlopen(req, timeout=10) as r:
+        sessions = json.load(r)
+    return sum(1 for s in sessions if s.get("NowPlayingItem"))
+
+
+def qbittorrent_speed(section: configparser.SectionProxy) -> int:
+    """Return download + upload speed in bytes/s."""
+    base = section["url"].rstrip("/")
+    opener = urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+    )
+    if section["username"]:
+        data = urllib.parse.urlencode(
+            {"username": section["username"], "password": section["password"]}
+        ).encode()
+        opener.open(urllib.request.Request(f"{base}/api/v2/auth/login", data=data), timeout=10)
+    with opener.open(f"{base}/api/v2/transfer/info", timeout=10) as r:
+        info = json.load(r)
+    return info.get("dl_info_speed", 0) + info.get("up_info_speed", 0)
+
+
+class IdleMonitor:
+    def __init__(self, config: configparser.ConfigParser, device: str):
+        self.config = config
+        self.device = device
+        self.disk_limit = config["idle"].getfloat("disk_mib_s") * 1024**2
+        self.qbit_limit = config["idle"].getfloat("qbittorrent_kib_s") * 1024
+        self.last_bytes = disk_bytes(device)
+        self.last_time = time.monotonic()
+
+    def check(self, own_bytes: int = 0) -> Busy:
+        """Check all busy conditions; own_bytes is I/O we caused since the last check."""
+        now = time.monotonic()
+        current = disk_bytes(self.device)
+        elapsed = max(now - self.last_time, 1e-3)
+        foreign = max(0, current - self.last_bytes - own_bytes) / elapsed
+        self.last_bytes, self.last_time = current, now
+
+        try:
+            playing = jellyfin_playing(self.config["jellyfin"])
+        except (OSError, ValueError):
+            playing = 0  # Jellyfin not installed, not running or still starting
+        if playing:
+            return Busy(f"Jellyfin is streaming to {playing} session(s)")
+
+        try:
+            speed = qbittorrent_speed(self.config["qbittorrent"])
+        except (OSError, ValueError):
+            speed = 0
+        if speed > self.qbit_limit:
+            return Busy(f"qBittorrent is transferring {speed / 1024:.0f} KiB/s")
+
+        if foreign > self.disk_limit:
+            return Busy(f"disk I/O at {foreign / 1024**2:.1f} MiB/s")
+        return Busy()
+
+
+# --- tasks -----------------------------------------------------------------
+
+
+def scrub_status(mount: str) -> tuple[str, int]:
+    out = _btrfs("scrub", "status", "-R", mount, check=False).stdout
+    m = SCRUB_STATUS_RE.search(out)
+    status = m.group(1).lower() if m else "none"
+    scrubbed = sum(int(n) for _, n in SCRUB_BYTES_RE.findall(out))
+    return status, scrubbed
+
+
+def scrub_start(mount: str, resume: bool) -> None:
+    # -c 3: idle I/O class, so any other reader goes first
+    if resume:
+        _btrfs("scrub", "resume", "-c", "3", mount)
+    else:
+        _btrfs("scrub", "start", "-c", "3", mount)
+
+
+def balance_status(mount: str) -> str:
+    out = _btrfs("balance", "status", mount, check=False).stdout
+    if "is paused" in out:
+        return "paused"
+    if "running" in out:
+        return "running"
+    return "idle"
+
+
+def run_scrub(mount: str, monitor: IdleMonitor, deadline: float, poll: float) -> dict:
+    status, scrubbed = scrub_status(mount)
+    resumable = status in ("aborted", "interrupted")
+    start_bytes = scrubbed if resumable else 0
+    active_seconds = 0.0
+    pauses = 0
+    running = False
+    last_bytes = scrubbed
+
+    while time.monotonic() < deadline:
+        status, scrubbed = scrub_status(mount)
+        own = max(0, scrubbed - last_bytes) if running else 0
+        last_bytes = scrubbed
+        if running and status == "finished":
+            break
+        if running and status != "running":
+            # Stopped by something else (e.g. an I/O error); resume later
+            running = False
+
+        busy = monitor.check(own)
+        if running:
+            active_seconds += poll
+            if busy:
+                print(f"Pausing scrub: {busy.reason}")
+                _btrfs("scrub", "cancel", mount, check=False)
+                running = False
+                pauses += 1
+        elif not busy:
+            print("Resuming scrub" if resumable else "Starting scrub")
+            scrub_start(mount, resumable)
+            running = resumable = True
+        time.sleep(poll)
+    else:
+        if running:
+            print("Maximum runtime reached, pausing scrub until the next run")
+            _btrfs("scrub", "cancel", mount, check=False)
+        status = "paused"
+
+    _, scrubbed = scrub_status(mount)
+    done = scrubbed - start_bytes
+    return {
+        "task": "scrub",
+        "result": "finished" if status == "finished" else "paused",
+        "bytes": scrubbed,
+        "bytes_this_run": done,
+        "active_seconds": round(active_seconds),
+        "pauses": pauses,
+        "mib_s": round(done / 1024**2 / active_seconds, 1) if active_seconds else 0,
+    }
+
+
+def run_balance(
+    mount: str, usage: int, monitor: IdleMonitor, deadline: float, poll: float
+) -> dict:
+    active_seconds = 0.0
+    pauses = 0
+    state = balance_status(mount)
+    started = state != "idle"
+
+    while time.monotonic() < deadline:
+        state = balance_status(mount)
+        if started and state == "idle":
+            break
+
+        # The disk check cannot tell balance I/O from other I/O, so only the
+        # service checks can pause a running balance
+        busy = monitor.check()
+        if state == "running":
+            active_seconds += poll
+            if busy and not busy.reason.startswith("disk"):
+                print(f"Pausing balance: {busy.reason}")
+                _btrfs("balance", "pause", mount, check=False)
+                pauses += 1
+        elif not busy:
+            if state == "paused":
+                print("Resuming balance")
+                _btrfs("balance", "resume", mount, check=False)
+            else:
+                print(f"Starting balance (block groups up to {usage}% full)")
+                _btrfs(
+                    "balance", "start", "--bg",
+                    f"-dusage={usage}", f"-musage={usage}", mount,
+                )
+                started = True
+        time.sleep(poll)
+    else:
+        if balance_status(mount) == "running":
+            print("Maximum runtime reached, pausing balance until the next run")
+            _btrfs("balance", "pause", mount, check=False)
+        state = "paused"
+
+    return {
+        "task": "balance",
+        "result": "finished" if state == "idle" else "paused",
+        "active_seconds": round(active_seconds),
+        "pauses": pauses,
+    }
+
+
+def is_due(state: dict, task: str, interval_days: float) -> bool:
+    last = state["last"].get(task)
+    return last is None or time.time() - last >= interval_days * 86400
+
+
+def cmd_run(args) -> None:
+    config = load_config()
+    section = config["maintenance"]
+    mount = section["mount"]
+    poll = section.getfloat("poll_seconds")
+    deadline = time.monotonic() + section.getfloat("max_runtime_minutes") * 60
+
+    state = load_state()
+    # A paused scrub or balance always continues, even before its interval
+    due = []
+    if (
+        args.force == "scrub"
+        or scrub_status(mount)[0] in ("aborted", "interrupted")
+        or is_due(state, "scrub", section.getfloat("scrub_interval_days"))
+    ):
+        due.append("scrub")
+    if (
+        args.force == "balance"
+        or balance_status(mount) == "paused"
+        or is_due(state, "balance", section.getfloat("balance_interval_days"))
+    ):
+        due.append("balance")
+
+    if not due:
+        print("Nothing due")
+        return
+
+    monitor = IdleMonitor(config, block_device(mount))
+    for task in due:
+        started = time.time()
+        if task == "scrub":
+            record = run_scrub(mount, monitor, deadline, poll)
+        else:
+            record = run_balance(
+                mount, section.getint("balance_usage"), monitor, deadline, poll
+            )
+        record["started"] = started
+        record["ended"] = time.time()
+        state["history"].append(record)
+        if record["result"] == "finished":
+            state["last"][task] = record["ended"]
+        save_state(state)
+        print(f"{task}: {record['result']} ({record['active_seconds']}s active, {record['pauses']} pauses)")
+
+
+def cmd_status(args) -> None:
+    state = load_state()
+    for task in ("scrub", "balance"):
+        last = state["last"].get(task)
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(last)) if last else "never"
+        print(f"Last completed {task}: {when}")
+    if not state["history"]:
+        return
+
+    print()
+    print(f"{'Started':<18}{'Task':<9}{'Result':<10}{'Active':>8}{'Pauses':>8}{'Scrubbed':>11}{'MiB/s':>8}")
+    for r in state["history"]:
+        scrubbed = f"{r['bytes'] / 1024**3:.1f}G" if "bytes" in r else "-"
+        print(
+            f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(r['started'])):<18}"
+            f"{r['task']:<9}{r['result']:<10}{r['active_seconds']:>7}s{r['pauses']:>8}"
+            f"{scrubbed:>11}{r.get('mib_s', '-'):>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Idle-aware btrfs scrub and balance for the /srv volume."
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="Run due maintenance while the system is idle")
+    r.add_argument(
+        "--force",
+        choices=("scrub", "balance"),
+        help="Run this task even if it is not due yet",
+    )
+    sub.add_parser("status", help="Show recorded runs")
+    args = parser.parse_args()
+
+    try:
+        if args.cmd == "run":
+            cmd_run(args)
+        elif args.cmd == "status":
+            cmd_status(args)
+    except subprocess.CalledProcessError as e:
+        print(f"Error: {' '.join(e.cmd)}: {e.stderr.strip()}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
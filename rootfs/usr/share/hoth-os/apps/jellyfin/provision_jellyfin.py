@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Provision a fresh Jellyfin install via its API with settings suited to a Pi.
+
+Completes the startup wizard (or logs in if it was already completed),
+creates Movies and TV Shows libraries for /movies and /tv with real-time
+monitoring, turns off chapter image, trickplay and audio normalization work,
+moves the full library scan to once a week, and limits transcoding threads
+and enables throttling based on the host's CPU count. Finally runs the first
+library scan and reports how long it took.
+
+Requirements:
+- Python 3.10+
+- requests (pip install requests)
+
+Usage examples:
+  # Provision a new install, creating the admin user
+  python provision_jellyfin.py \
+    --jellyfin-url http://localhost:8096 \
+    --username admin \
+    --password <PASSWORD>
+
+  # Re-apply the settings without scanning
+  python provision_jellyfin.py \
+    --jellyfin-url http://localhost:8096 \
+    --username admin \
+    --password <PASSWORD> \
+    --no-scan
+"""
+
+import argparse
+import os
+import sys
+import time
+from urllib.parse import urljoin
+
+import requests
+
+CLIENT_AUTH = (
+    'MediaBrowser Client="hoth-os", Device="hoth-os", '
+    'DeviceId="hoth-os-provision", Version="1.0"'
+)
+
+LIBRARIES = (
+    {"name": "Movies", "collectionType": "movies", "path": "/movies"},
+    {"name": "TV Shows", "collectionType": "tvshows", "path": "/tv"},
+)
+
+# Per-library options that trigger CPU-heavy work on every scan
+LIBRARY_OPTIONS = {
+    "EnableRealtimeMonitor": True,
+    "EnableChapterImageExtraction": False,
+    "ExtractChapterImagesDuringLibraryScan": False,
+    "EnableTrickplayImageExtraction": False,
+    "ExtractTrickplayImagesDuringLibraryScan": False,
+}
+
+DISABLED_TASKS = ("RefreshChapterImages", "RefreshTrickplayImages", "AudioNormalization")
+LIBRARY_SCAN_TASK = "RefreshLibrary"
+# Sunday 04:00; real-time monitoring picks up changes in between
+WEEKLY_SCAN_TRIGGER = {
+    "Type": "WeeklyTrigger",
+    "DayOfWeek": "Sunday",
+    "TimeOfDayTicks": 4 * 60 * 60 * 10**7,
+}
+
+
+def _normalize_base_url(u: str) -> str:
+    return u.rstrip("/")
+
+
+class Jellyfin:
+    def __init__(self, url: str, verify: bool):
+        self.url = _normalize_base_url(url)
+        self.verify = verify
+        self.auth = CLIENT_AUTH
+
+    def _request(self, method: str, path: str, **kwargs):
+        r = requests.request(
+            method,
+            urljoin(self.url + "/", path),
+            headers={"Authorization": self.auth, "Accept": "application/json"},
+            timeout=30,
+            verify=self.verify,
+            **kwargs,
+        )
+        if r.status_code >= 400:
+            raise RuntimeError(f"{method} /{path} failed: {r.status_code} {r.text}")
+        return r.json() if r.content else None
+
+    def get(self, path: str, **kwargs):
+        return self._request("GET", path, **kwargs)
+
+    def post(self, path: str, payload=None, **kwargs):
+        return self._request("POST", path, json=payload, **kwargs)
+
+    def wait_until_ready(self, timeout: float = 300) -> dict:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.get("System/Info/Public")
+            except (requests.RequestException, RuntimeError):
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Jellyfin at {self.url} did not become ready")
+                time.sleep(2)
+
+    def complete_wizard(self, username: str, password: str) -> None:
+        self.post(
+            "Startup/Configuration",
+            {
+                "UICulture": "en-US",
+                "MetadataCountryCode": "US",
+                "PreferredMetadataLanguage": "en",
+            },
+        )
+        # GET creates the initial user, POST names it
+        self.get("Startup/User")
+        self.post("Startup/User", {"Name": username, "Password": password})
+        self.post(
+            "Startup/RemoteAccess",
+            {"EnableRemoteAccess": True, "EnableAutomaticPortMapping": False},
+        )
+        self.post("Startup/Complete")
+
+    def login(self, username: str, password: str) -> None:
+        result = self.post("Users/AuthenticateByName", {"Username": username, "Pw": password})
+        self.auth = f'{CLIENT_AUTH}, Token="{result["AccessToken"]}"'
+
+
+def setup_libraries(jf: Jellyfin) -> list[str]:
+    """Create missing libraries and apply the options to all; return new names."""
+    existing = {f["Name"]: f for f in jf.get("Library/VirtualFolders")}
+    created = []
+    for lib in LIBRARIES:
+        folder = existing.get(lib["name"])
+        if folder is None:
+            jf.post(
+                "Library/VirtualFolders",
+                {"LibraryOptions": dict(LIBRARY_OPTIONS)},
+                params={
+                    "name": lib["name"],
+                    "collectionType": lib["collectionType"],
+                    "paths": lib["path"],
+                    "refreshLibrary": "false",
+                },
+            )
+            created.append(lib["name"])
+            print(f"✓ Created library {lib['name']} ({lib['path']})")
+            continue
+
+        options = folder.get("LibraryOptions", {})
+        if all(options.get(k) == v for k, v in LIBRARY_OPTIONS.items()):
+            print(f"  Library {lib['name']} already configured")
+            continue
+        options.update(LIBRARY_OPTIONS)
+        jf.post(
+            "Library/VirtualFolders/LibraryOptions",
+            {"Id": folder["ItemId"], "LibraryOptions": options},
+        )
+        print(f"✓ Updated library {lib['name']}")
+    return created
+
+
+def setup_scheduled_tasks(jf: Jellyfin) -> None:
+    for task in jf.get("ScheduledTasks"):
+        key = task.get("Key")
+        if key in DISABLED_TASKS:
+            triggers = []
+        elif key == LIBRARY_SCAN_TASK:
+            triggers = [WEEKLY_SCAN_TRIGGER]
+        else:
+            continue
+        if task.get("Triggers") == triggers:
+            print(f"  Task '{task['Name']}' already configured")
+            continue
+        jf.post(f"ScheduledTasks/{task['Id']}/Triggers", triggers)
+        print(
+            f"✓ Task '{task['Name']}': "
+            f"{'weekly, Sunday 04:00' if triggers else 'disabled'}"
+        )
+
+
+def setup_encoding(jf: Jellyfin, cpus: int) -> None:
+    config = jf.get("System/Configuration/encoding")
+    # Leave a core for the host and the rest of the stack
+    threads = max(1, cpus - 1)
+    config.update(
+        {
+            "EncodingThreadCount": threads,
+            # Pause transcoding once it is far enough ahead of playback
+            "EnableThrottling": True,
+            "ThrottleDelaySeconds": 180,
+            "EnableSegmentDeletion": True,
+        }
+    )
+    jf.post("System/Configuration/encoding", config)
+    print(f"✓ Transcoding: {threads} threads ({cpus} CPUs), throttling enabled")
+
+
+def run_first_scan(jf: Jellyfin, timeout: float) -> None:
+    def scan_task() -> dict:
+        return next(t for t in jf.get("ScheduledTasks") if t.get("Key") == LIBRARY_SCAN_TASK)
+
+    print("Scanning libraries...")
+    start = time.monotonic()
+    jf.post("Library/Refresh")
+
+    # The task may take a moment to report Running
+    while scan_task().get("State") == "Idle" and time.monotonic() - start < 30:
+        time.sleep(1)
+    last_progress = -10.0
+    while (task := scan_task()).get("State") != "Idle":
+        if time.monotonic() - start > timeout:
+            print(f"Scan still running after {timeout:.0f}s, not waiting any longer")
+            return
+        progress = task.get("CurrentProgressPercentage") or 0.0
+        if progress - last_progress >= 10:
+            print(f"  {progress:.0f}%")
+            last_progress = progress
+        time.sleep(2)
+    elapsed = time.monotonic() - start
+
+    counts = jf.get("Items/Counts")
+    print(
+        f"✓ First library scan took {elapsed:.0f}s: "
+        f"{counts.get('MovieCount', 0)} movies, {counts.get('SeriesCount', 0)} series, "
+        f"{counts.get('EpisodeCount', 0)} episodes"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Provision Jellyfin libraries, tasks and transcoding for low-power hosts."
+    )
+    parser.add_argument(
+        "--jellyfin-url",
+        default="http://localhost:8096",
+        help="Jellyfin base URL (default: http://localhost:8096)",
+    )
+    parser.add_argument("--username", required=True, help="Admin username")
+    parser.add_argument("--password", required=True, help="Admin password")
+    parser.add_argument(
+        "--cpus",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="CPU count to size transcoding threads for (default: this host's)",
+    )
+    parser.add_argument(
+        "--no-scan", action="store_true", help="Do not run the first library scan"
+    )
+    parser.add_argument(
+        "--scan-timeout",
+        type=float,
+        default=3600,
+        help="Seconds to wait for the first scan (default: 3600)",
+    )
+    parser.add_argument(
+        "--insecure",
+        action="store_true",
+        help="Disable TLS verification (not recommended)",
+    )
+    args = parser.parse_args()
+
+    try:
+        jf = Jellyfin(args.jellyfin_url, verify=not args.insecure)
+        info = jf.wait_until_ready()
+        if not info.get("StartupWizardCompleted"):
+            jf.complete_wizard(args.username, args.password)
+            print(f"✓ Startup wizard completed, admin user '{args.username}' created")
+        jf.login(args.username, args.password)
+
+        created = setup_libraries(jf)
+        setup_scheduled_tasks(jf)
+        setup_encoding(jf, args.cpus)
+
+        if created and not args.no_scan:
+            run_first_scan(jf, args.scan_timeout)
+        print("✓ Jellyfin provisioned")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
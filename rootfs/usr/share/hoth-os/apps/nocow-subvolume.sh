@@ -0,0 +1,40 @@
+#!/bin/bash
+set -Eeuo pipefail
+
+# Create a NOCOW, uncompressed btrfs subvolume at the given path, e.g. for
+# incomplete torrent downloads. Random piece writes into a copy-on-write file
+# fragment it badly; with NOCOW they are written in place.
+#
+# Usage: nocow-subvolume.sh <path> [owner]
+
+TARGET="${1:?Usage: nocow-subvolume.sh <path> [owner]}"
+OWNER="${2:-}"
+PARENT="$(dirname "$TARGET")"
+
+mkdir -p "$PARENT"
+
+if [ "$(stat -f -c %T "$PARENT")" != "btrfs" ]; then
+    echo "$PARENT is not on btrfs, creating a plain directory"
+    mkdir -p "$TARGET"
+elif btrfs subvolume show "$TARGET" &>/dev/null; then
+    echo "$TARGET is already a subvolume"
+else
+    if [ -d "$TARGET" ]; then
+        if [ -n "$(ls -A "$TARGET")" ]; then
+            # Existing files keep their COW extents, so they cannot just be flagged
+            echo "Warning: $TARGET is not empty, leaving it as a plain directory"
+            echo "Move its contents away and run this again to convert it"
+            exit 0
+        fi
+        rmdir "$TARGET"
+    fi
+    btrfs subvolume create "$TARGET"
+    # +C must be set while the subvolume is empty; new files inherit it, and
+    # btrfs never compresses NOCOW files
+    chattr +C "$TARGET"
+    echo "✓ Created NOCOW subvolume $TARGET"
+fi
+
+if [ -n "$OWNER" ]; then
+    chown "$OWNER" "$TARGET"
+fi
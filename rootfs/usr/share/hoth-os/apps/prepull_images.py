@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Pull every image referenced by an app's quadlets before its units are started.
+
+Reads the Image= lines from the given quadlet files or directories and pulls
+the images concurrently (bounded by --jobs), printing per-image progress,
+how many layers were shared between images and how long the pulls took.
+Exits non-zero if any image could not be pulled, so callers can avoid
+starting a pod whose containers would pull inside their unit start.
+
+Requirements:
+- Python 3.10+
+- podman
+
+Usage examples:
+  # Pull everything the arr-stack needs, two images at a time
+  python prepull_images.py /usr/share/hoth-os/apps/arr-stack/quadlets
+
+  # Test against a local plain-HTTP registry, with a quadlet whose
+  # Image= points at localhost:5000/<name>
+  podman run -d -p 5000:5000 --name registry docker.io/library/registry:2
+  podman push --tls-verify=false <image> localhost:5000/<name>
+  python prepull_images.py --no-tls-verify --force test.container
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+BLOB_RE = re.compile(r"Copying blob (?:sha256:)?([0-9a-f]+)(.*)")
+TREE_LAYER_RE = re.compile(r"ID:\s*([0-9a-f]+)\s+Size:\s*([\d.]+)\s*([kKMGT]?B)")
+SIZE_UNITS = {"B": 1, "kB": 1000, "KB": 1000, "MB": 1000**2, "GB": 1000**3, "TB": 1000**4}
+
+_print_lock = threading.Lock()
+
+
+@dataclass
+class PullResult:
+    image: str
+    ok: bool = False
+    skipped: bool = False
+    seconds: float = 0.0
+    blobs: set[str] = field(default_factory=set)
+    reused: set[str] = field(default_factory=set)
+    error: str = ""
+
+
+def _log(message: str) -> None:
+    with _print_lock:
+        print(message, flush=True)
+
+
+def find_images(paths: list[Path]) -> list[str]:
+    """Return the unique Image= values of the quadlets, in file order."""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files += sorted(path.glob("*.container"))
+        else:
+            files.append(path)
+
+    images = []
+    for f in files:
+        for line in f.read_text().splitlines():
+            key, sep, value = line.partition("=")
+            if sep and key.strip() == "Image" and value.strip() not in images:
+                images.append(value.strip())
+    return images
+
+
+def image_exists(image: str) -> bool:
+    return subprocess.run(["podman", "image", "exists", image]).returncode == 0
+
+
+def pull(image: str, tls_verify: bool, force: bool) -> PullResult:
+    result = PullResult(image)
+    if not force and image_exists(image):
+        result.ok = result.skipped = True
+        _log(f"  {image}: already present")
+        return result
+
+    _log(f"↓ {image}: pulling...")
+    start = time.monotonic()
+    cmd = ["podman", "pull", f"--tls-verify={str(tls_verify).lower()}", image]
+    proc = subprocess.Popen(
+        cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    tail = []
+    for line in proc.stderr:
+        line = line.strip()
+        tail = (tail + [line])[-5:]
+        m = BLOB_RE.search(line)
+        if not m:
+            continue
+        digest, rest = m.group(1)[:12], m.group(2)
+        if digest in result.blobs:
+            continue
+        result.blobs.add(digest)
+        if "already exists" in rest:
+            result.reused.add(digest)
+        _log(
+            f"  {image}: layer {len(result.blobs)} {digest}"
+            f"{' (reused)' if digest in result.reused else ''}"
+        )
+    proc.wait()
+    result.seconds = time.monotonic() - start
+    result.ok = proc.returncode == 0
+
+    if result.ok:
+        _log(
+            f"✓ {image}: pulled in {result.seconds:.1f}s "
+            f"({len(result.blobs)} layers, {len(result.reused)} reused)"
+        )
+    else:
+        result.error = tail[-1] if tail else f"podman exited with {proc.returncode}"
+        _log(f"✗ {image}: {result.error}")
+    return result
+
+
+def _parse_size(value: str, unit: str) -> int:
+    return int(float(value) * SIZE_UNITS[unit])
+
+
+def layer_sizes(image: str) -> dict[str, int]:
+    """Map storage layer ID to size using `podman image tree`."""
+    out = subprocess.run(
+        ["podman", "image", "tree", image], capture_output=True, text=True
+    ).stdout
+    return {
+        m.group(1): _parse_size(m.group(2), m.group(3))
+        for m in TREE_LAYER_RE.finditer(out)
+    }
+
+
+def report_sharing(images: list[str]) -> None:
+    per_image = {image: layer_sizes(image) for image in images}
+    total_refs = sum(len(layers) for layers in per_image.values())
+    unique = {}
+    for layers in per_image.values():
+        unique.update(layers)
+    if not unique:
+        return
+
+    total_bytes = sum(sum(layers.values()) for layers in per_image.values())
+    unique_bytes = sum(unique.values())
+    shared = total_refs - len(unique)
+    print(
+        f"Layers: {total_refs} referenced, {len(unique)} unique, {shared} shared "
+        f"(saved {(total_bytes - unique_bytes) / 1000**2:.1f} MB of "
+        f"{total_bytes / 1000**2:.1f} MB)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pull all images referenced by quadlets before starting them."
+    )
+    parser.add_argument(
+        "paths", nargs="+", type=Path, help="Quadlet files or directories to scan"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=2,
+        help="Maximum number of concurrent pulls (default: 2)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Pull even if the image is already present (refresh :latest tags)",
+    )
+    parser.add_argument(
+        "--no-tls-verify",
+        action="store_true",
+        help="Disable TLS verification (e.g. for a local test registry)",
+    )
+    args = parser.parse_args()
+
+    try:
+        images = find_images(args.paths)
+        if not images:
+            print("No Image= lines found")
+            return
+
+        print(f"Pulling {len(images)} images ({args.jobs} at a time)...")
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            results = list(
+                pool.map(
+                    lambda image: pull(image, not args.no_tls_verify, args.force),
+                    images,
+                )
+            )
+        wall = time.monotonic() - start
+        print()
+
+        pulled = [r for r in results if r.ok and not r.skipped]
+        failed = [r for r in results if not r.ok]
+        serial = sum(r.seconds for r in pulled)
+        print(
+            f"Pulled {len(pulled)}, already present {len(results) - len(pulled) - len(failed)}, "
+            f"failed {len(failed)}"
+        )
+        print(f"Time: {wall:.1f}s wall, {serial:.1f}s if pulled one by one")
+        report_sharing([r.image for r in results if r.ok])
+
+        if failed:
+            for r in failed:
+                print(f"Error: {r.image}: {r.error}", file=sys.stderr)
+            sys.exit(1)
+        print("✓ All images are available locally")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Render an app's quadlets from its typed settings file and restart only what changed.
+
+Each app has one settings file at ~/.config/hoth-os/<app>.toml. Every template
+in the app's quadlet directory is rendered in memory by substituting
+__FIELD_NAME__ placeholders, then compared by content hash against the
+installed quadlet. Only files whose hash changed are written, and only the
+units behind those files are restarted.
+
+With a saved resource profile (hjust resource-profile), the memory budget is
+re-split across all installed services; other apps' containers whose share
+changed are rewritten too, but not restarted.
+
+Requirements:
+- Python 3.11+ (tomllib)
+
+Usage examples:
+  # Change the Sonarr port; only the pod is rewritten and restarted
+  python quadlet_render.py render arr-stack --set sonarr_port=8990
+
+  # Render without touching systemd
+  python quadlet_render.py render jellyfin --no-restart
+
+  # Read a setting (for wizard defaults)
+  python quadlet_render.py get arr-stack sonarr_port
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import resource_profile
+
+APPS_DIR = Path(__file__).resolve().parent
+SETTINGS_DIR = resource_profile.config_home() / "hoth-os"
+PLACEHOLDER_RE = re.compile(r"__[A-Z][A-Z0-9_]*__")
+
+
+@dataclass
+class ArrStackSettings:
+    base_path: str = "/srv"
+    sonarr_port: int = 8989
+    radarr_port: int = 7878
+    prowlarr_port: int = 9696
+    qbit_port: int = 8080
+    torrent_port: int = 6881
+
+
+@dataclass
+class JellyfinSettings:
+    base_path: str = "/srv"
+    web_port: int = 8096
+    movies_path: str = "/srv/data/movies"
+    tv_path: str = "/srv/data/tv"
+    hostname: str = field(default_factory=socket.gethostname)
+
+
+@dataclass
+class GlanceSettings:
+    web_port: int = 8090
+    timezone: str = "Etc/UTC"
+
+
+@dataclass
+class SyncthingSettings:
+    base_path: str = "/srv"
+    web_port: int = 8384
+    puid: int = field(default_factory=os.getuid)
+    pgid: int = field(default_factory=os.getgid)
+
+
+@dataclass(frozen=True)
+class App:
+    settings: type
+    template_dir: Path
+    templates: tuple[str, ...]
+    # Unit started when nothing changed, in case it is not running yet
+    entry_unit: str
+
+
+APPS = {
+    "arr-stack": App(
+        ArrStackSettings,
+        APPS_DIR / "arr-stack" / "quadlets",
+        (
+            "arr-stack.pod",
+            "sonarr.container",
+            "radarr.container",
+            "prowlarr.container",
+            "flaresolverr.container",
+            "qbittorrent.container",
+        ),
+        "arr-stack-pod.service",
+    ),
+    "jellyfin": App(
+        JellyfinSettings,
+        APPS_DIR / "jellyfin" / "quadlets",
+        ("jellyfin.pod", "jellyfin.container"),
+        "jellyfin-pod.service",
+    ),
+    "glance": App(
+        GlanceSettings,
+        APPS_DIR / "glance" / "quadlets",
+        ("glance.pod", "glance.container"),
+        "glance-pod.service",
+    ),
+    "syncthing": App(
+        SyncthingSettings,
+        APPS_DIR.parent / "quadlets",
+        ("syncthing.container",),
+        "syncthing.service",
+    ),
+}
+
+
+def settings_path(app_name: str) -> Path:
+    return SETTINGS_DIR / f"{app_name}.toml"
+
+
+def _coerce(f: dataclasses.Field, value: str) -> int | str:
+    if f.type is int:
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{f.name} must be an integer, got {value!r}") from None
+    return value
+
+
+def load_settings(app_name: str):
+    """Load and type-check the app's settings, using defaults for missing keys."""
+    app = APPS[app_name]
+    path = settings_path(app_name)
+    data = {}
+    if path.exists():
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+
+    known = {f.name: f for f in dataclasses.fields(app.settings)}
+    for key, value in data.items():
+        if key not in known:
+            raise ValueError(f"{path}: unknown setting '{key}'")
+        expected = known[key].type
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise ValueError(
+                f"{path}: '{key}' must be {expected.__name__}, got {type(value).__name__}"
+            )
+    return app.settings(**data)
+
+
+def save_settings(app_name: str, settings) -> None:
+    path = settings_path(app_name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = [f"# hoth-os {app_name} settings, managed by quadlet_render.py"]
+    for key, value in dataclasses.asdict(settings).items():
+        # JSON string escaping is valid for TOML basic strings
+        lines.append(f"{key} = {json.dumps(value)}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def update_settings(settings, assignments: list[str]):
+    known = {f.name: f for f in dataclasses.fields(settings)}
+    changes = {}
+    for assignment in assignments:
+        key, sep, value = assignment.partition("=")
+        if not sep:
+            raise ValueError(f"Expected KEY=VALUE, got {assignment!r}")
+        if key not in known:
+            raise ValueError(f"Unknown setting '{key}'")
+        changes[key] = _coerce(known[key], value)
+    return dataclasses.replace(settings, **changes)
+
+
+def render_template(text: str, settings) -> str:
+    for key, value in dataclasses.asdict(settings).items():
+        text = text.replace(f"__{key.upper()}__", str(value))
+    leftover = sorted(set(PLACEHOLDER_RE.findall(text)))
+    if leftover:
+        raise ValueError(f"Unresolved placeholders: {', '.join(leftover)}")
+    return text
+
+
+def unit_for(filename: str) -> str:
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}-pod.service" if ext == ".pod" else f"{stem}.service"
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def current_profiles(
+    app_name: str, quadlet_dir: Path
+) -> list[resource_profile.ServiceProfile]:
+    """Split the saved resource profile across the installed services plus this app's."""
+    profile_config = resource_profile.PROFILE_CONFIG_FILE
+    if not profile_config.exists():
+        return []
+    priority, reserve = resource_profile.load_profile_config(profile_config)
+    total = resource_profile.read_total_memory_mib()
+    if reserve is None:
+        reserve = resource_profile.default_reserve_mib(total)
+    services = set(resource_profile.installed_services(quadlet_dir))
+    services |= {Path(n).stem for n in APPS[app_name].templates if n.endswith(".container")}
+    return resource_profile.compute_profiles(sorted(services), priority, total, reserve)
+
+
+def render_app(
+    app_name: str, settings, profiles: list[resource_profile.ServiceProfile]
+) -> dict[str, str]:
+    """Render every template of the app in memory, keyed by file name."""
+    app = APPS[app_name]
+    rendered = {
+        name: render_template((app.template_dir / name).read_text(), settings)
+        for name in app.templates
+    }
+    for p in profiles:
+        name = f"{p.name}.container"
+        if name in rendered:
+            rendered[name] = resource_profile.apply_profile(
+                rendered[name], p.service_settings()
+            )
+    return rendered
+
+
+def reprofile_others(
+    rendered: dict[str, str], profiles: list[resource_profile.ServiceProfile], quadlet_dir: Path
+) -> dict[str, str]:
+    """Return other apps' installed containers whose share of the budget changed."""
+    updated = {}
+    for p in profiles:
+        name = f"{p.name}.container"
+        path = quadlet_dir / name
+        if name in rendered or not path.exists():
+            continue
+        current = path.read_text()
+        text = resource_profile.apply_profile(current, p.service_settings())
+        if text != current:
+            updated[name] = text
+    return updated
+
+
+def changed_files(rendered: dict[str, str], quadlet_dir: Path) -> list[str]:
+    changed = []
+    for name, text in rendered.items():
+        path = quadlet_dir / name
+        if not path.exists() or _digest(path.read_text()) != _digest(text):
+            changed.append(name)
+    return changed
+
+
+def units_to_restart(changed: list[str]) -> list[str]:
+    # Restarting a pod restarts every container bound to it
+    pods = [unit_for(n) for n in changed if n.endswith(".pod")]
+    if pods:
+        return pods
+    return [unit_for(n) for n in changed]
+
+
+def _systemctl(*args: str) -> None:
+    subprocess.run(["systemctl", "--user", *args], check=True)
+
+
+def cmd_render(args) -> None:
+    settings = load_settings(args.app)
+    if args.set:
+        settings = update_settings(settings, args.set)
+
+    profiles = current_profiles(args.app, args.quadlet_dir)
+    rendered = render_app(args.app, settings, profiles)
+    changed = changed_files(rendered, args.quadlet_dir)
+    # Adding an app shrinks every other service's share of the memory budget
+    others = reprofile_others(rendered, profiles, args.quadlet_dir)
+
+    for name in rendered:
+        print(f"{'✓ Updated' if name in changed else '  Unchanged'} {name}")
+    for name in others:
+        print(f"✓ Updated resource profile of {name}")
+
+    if args.dry_run:
+        return
+
+    save_settings(args.app, settings)
+    args.quadlet_dir.mkdir(parents=True, exist_ok=True)
+    for name in changed:
+        (args.quadlet_dir / name).write_text(rendered[name])
+    for name, text in others.items():
+        (args.quadlet_dir / name).write_text(text)
+    if others:
+        print(
+            f"  Not restarted: {', '.join(unit_for(n) for n in others)}; "
+            "restart them to apply the new limits"
+        )
+
+    if args.no_restart:
+        return
+
+    if changed or others:
+        _systemctl("daemon-reload")
+    if changed:
+        units = units_to_restart(changed)
+        print(f"Restarting {', '.join(units)}...")
+        _systemctl("restart", *units)
+    else:
+        _systemctl("start", APPS[args.app].entry_unit)
+
+
+def cmd_get(args) -> None:
+    settings = load_settings(args.app)
+    values = dataclasses.asdict(settings)
+    if args.key not in values:
+        raise ValueError(f"Unknown setting '{args.key}'")
+    print(values[args.key])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render app quadlets from typed settings with change detection."
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("render", help="Render quadlets and restart changed units")
+    r.add_argument("app", choices=sorted(APPS))
+    r.add_argument(
+        "--set",
+        action="append",
+        metavar="KEY=VALUE",
+        help="Update a setting before rendering (repeatable)",
+    )
+    r.add_argument(
+        "--quadlet-dir",
+        type=Path,
+        default=resource_profile.DEFAULT_QUADLET_DIR,
+        help=f"Installed quadlet directory (default: {resource_profile.DEFAULT_QUADLET_DIR})",
+    )
+    r.add_argument(
+        "--dry-run", action="store_true", help="Show what would change without writing"
+    )
+    r.add_argument(
+        "--no-restart", action="store_true", help="Write files but leave systemd alone"
+    )
+
+    g = sub.add_parser("get", help="Print a setting value")
+    g.add_argument("app", choices=sorted(APPS))
+    g.add_argument("key")
+
+    args = parser.parse_args()
+
+    try:
+        if args.cmd == "render":
+            cmd_render(args)
+        elif args.cmd == "get":
+            cmd_get(args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
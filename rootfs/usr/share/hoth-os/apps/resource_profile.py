@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Generate per-service CPU, memory and I/O resource profiles for installed quadlets.
+
+Reads the host's memory and CPU count, splits a memory budget across the
+installed services according to a priority ranking and writes
+MemoryHigh/MemoryMax, CPUWeight and IOWeight into each quadlet's [Service]
+section.
+
+Requirements:
+- Python 3.10+
+
+Usage examples:
+  # Show the profile for the installed services without touching any file
+  python resource_profile.py --dry-run
+
+  # Rank Jellyfin and Sonarr above everything else and apply
+  python resource_profile.py --priority jellyfin,sonarr,radarr,prowlarr,qbittorrent
+
+  # Keep 1 GiB for the host instead of the default reserve
+  python resource_profile.py --reserve-mib 1024
+"""
+
+import argparse
+import configparser
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+# Services in their default priority order, with the minimum memory (MiB)
+# each one needs to stay responsive.
+SERVICE_FLOORS_MIB = {
+    "jellyfin": 512,
+    "sonarr": 256,
+    "radarr": 256,
+    "prowlarr": 192,
+    "syncthing": 128,
+    "glance": 64,
+    "qbittorrent": 256,
+    "flaresolverr": 384,
+}
+DEFAULT_PRIORITY = list(SERVICE_FLOORS_MIB)
+UNKNOWN_SERVICE_FLOOR_MIB = 128
+
+MANAGED_KEYS = ("MemoryHigh", "MemoryMax", "CPUWeight", "IOWeight")
+
+# MemoryMax is allowed to overshoot the soft MemoryHigh share by this factor
+MEMORY_MAX_FACTOR = 1.5
+WEIGHT_TOP = 500
+WEIGHT_BOTTOM = 50
+
+
+def config_home() -> Path:
+    return Path(os.environ.get("XDG_CONFIG_HOME", Path.home() / ".config"))
+
+
+DEFAULT_QUADLET_DIR = config_home() / "containers" / "systemd"
+PROFILE_CONFIG_FILE = config_home() / "hoth-os" / "resource-profile.conf"
+
+
+@dataclass
+class ServiceProfile:
+    name: str
+    rank: int
+    memory_high_mib: int
+    memory_max_mib: int
+    cpu_weight: int
+    io_weight: int
+
+    def service_settings(self) -> dict[str, str]:
+        return {
+            "MemoryHigh": f"{self.memory_high_mib}M",
+            "MemoryMax": f"{self.memory_max_mib}M",
+            "CPUWeight": str(self.cpu_weight),
+            "IOWeight": str(self.io_weight),
+        }
+
+
+def read_total_memory_mib(meminfo: str = "/proc/meminfo") -> int:
+    with open(meminfo) as f:
+        for line in f:
+            if line.startswith("MemTotal:"):
+                return int(line.split()[1]) // 1024
+    raise RuntimeError(f"MemTotal not found in {meminfo}")
+
+
+def default_reserve_mib(total_mib: int) -> int:
+    # Leave room for the host, cockpit, tailscale and the page cache
+    return max(768, total_mib // 5)
+
+
+def load_profile_config(path: Path = PROFILE_CONFIG_FILE) -> tuple[list[str], int | None]:
+    """Return the saved (priority, reserve_mib), falling back to defaults."""
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if not parser.has_section("profile"):
+        return DEFAULT_PRIORITY, None
+    section = parser["profile"]
+    priority = _parse_priority(section.get("priority", "")) or DEFAULT_PRIORITY
+    reserve = section.getint("reserve_mib", fallback=None)
+    return priority, reserve
+
+
+def save_profile_config(
+    priority: list[str], reserve_mib: int | None, path: Path = PROFILE_CONFIG_FILE
+) -> None:
+    parser = configparser.ConfigParser()
+    parser["profile"] = {"priority": ", ".join(priority)}
+    if reserve_mib is not None:
+        parser["profile"]["reserve_mib"] = str(reserve_mib)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        parser.write(f)
+
+
+def _parse_priority(value: str) -> list[str]:
+    return [s.strip() for s in value.split(",") if s.strip()]
+
+
+def installed_services(quadlet_dir: Path) -> list[str]:
+    return sorted(p.stem for p in quadlet_dir.glob("*.container"))
+
+
+def _rank_weight(rank: int, count: int) -> int:
+    if count == 1:
+        return 100
+    step = (WEIGHT_TOP - WEIGHT_BOTTOM) / (count - 1)
+    return round(WEIGHT_TOP - rank * step)
+
+
+def compute_profiles(
+    services: list[str], priority: list[str], total_mib: int, reserve_mib: int
+) -> list[ServiceProfile]:
+    """Split the memory budget across services, highest priority first."""
+    ordered = [s for s in priority if s in services]
+    ordered += [s for s in DEFAULT_PRIORITY if s in services and s not in ordered]
+    ordered += [s for s in services if s not in ordered]
+    if not ordered:
+        return []
+
+    budget = total_mib - reserve_mib
+    if budget <= 0:
+        raise RuntimeError(
+            f"Reserve of {reserve_mib} MiB leaves no memory for services ({total_mib} MiB total)"
+        )
+
+    floors = [SERVICE_FLOORS_MIB.get(s, UNKNOWN_SERVICE_FLOOR_MIB) for s in ordered]
+    if sum(floors) > budget:
+        scale = budget / sum(floors)
+        floors = [int(f * scale) for f in floors]
+
+    count = len(ordered)
+    rank_shares = [count - rank for rank in range(count)]
+    spare = budget - sum(floors)
+
+    profiles = []
+    for rank, (name, floor) in enumerate(zip(ordered, floors)):
+        high = floor + int(spare * rank_shares[rank] / sum(rank_shares))
+        weight = _rank_weight(rank, count)
+        profiles.append(
+            ServiceProfile(
+                name=name,
+                rank=rank + 1,
+                memory_high_mib=high,
+                memory_max_mib=min(budget, int(high * MEMORY_MAX_FACTOR)),
+                cpu_weight=weight,
+                io_weight=weight,
+            )
+        )
+    return profiles
+
+
+def apply_profile(text: str, settings: dict[str, str]) -> str:
+    """Replace the managed keys in the [Service] section of a quadlet."""
+    lines = text.splitlines()
+    out = []
+    in_service = False
+    inserted = False
+
+    def insert():
+        # Keep a blank line between the keys and the next section header
+        while out and not out[-1].strip():
+            out.pop()
+        out.extend(f"{k}={v}" for k, v in settings.items())
+        out.append("")
+
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("[") and stripped.endswith("]"):
+            if in_service and not inserted:
+                insert()
+                inserted = True
+            if stripped == "[Install]" and not inserted:
+                while out and not out[-1].strip():
+                    out.pop()
+                out.extend(["", "[Service]"])
+                insert()
+                inserted = True
+            in_service = stripped == "[Service]"
+            out.append(line)
+            continue
+        if in_service and stripped.split("=", 1)[0].strip() in MANAGED_KEYS:
+            continue
+        out.append(line)
+
+    if not inserted:
+        if not in_service:
+            out.append("")
+            out.append("[Service]")
+        insert()
+
+    while out and not out[-1].strip():
+        out.pop()
+    return "\n".join(out) + "\n"
+
+
+def _fmt_mib(mib: int) -> str:
+    return f"{mib / 1024:.1f}G" if mib >= 1024 else f"{mib}M"
+
+
+def print_report(
+    profiles: list[ServiceProfile], total_mib: int, reserve_mib: int, cpus: int
+) -> None:
+    budget = total_mib - reserve_mib
+    print(f"Host: {cpus} CPUs, {_fmt_mib(total_mib)} RAM")
+    print(f"Reserved for host: {_fmt_mib(reserve_mib)}, service budget: {_fmt_mib(budget)}")
+    print()
+    print(
+        f"{'#':>2}  {'Service':<14}{'MemoryHigh':>11}{'MemoryMax':>11}"
+        f"{'Budget':>8}{'CPUWeight':>11}{'IOWeight':>10}"
+    )
+    for p in profiles:
+        share = 100 * p.memory_high_mib / budget
+        print(
+            f"{p.rank:>2}  {p.name:<14}{_fmt_mib(p.memory_high_mib):>11}"
+            f"{_fmt_mib(p.memory_max_mib):>11}{share:>7.1f}%"
+            f"{p.cpu_weight:>11}{p.io_weight:>10}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate resource profiles for the installed quadlets."
+    )
+    parser.add_argument(
+        "--priority",
+        help="Comma-separated service ranking, highest first (saved for later runs)",
+    )
+    parser.add_argument(
+        "--reserve-mib",
+        type=int,
+        help="Memory kept free for the host in MiB (default: max(768, 20%% of RAM))",
+    )
+    parser.add_argument(
+        "--quadlet-dir",
+        type=Path,
+        default=DEFAULT_QUADLET_DIR,
+        help=f"Directory with installed quadlets (default: {DEFAULT_QUADLET_DIR})",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the profile without writing files"
+    )
+    args = parser.parse_args()
+
+    try:
+        priority, reserve = load_profile_config()
+        if args.priority:
+            priority = _parse_priority(args.priority)
+        if args.reserve_mib is not None:
+            reserve = args.reserve_mib
+
+        total = read_total_memory_mib()
+        reserve_mib = reserve if reserve is not None else default_reserve_mib(total)
+
+        services = installed_services(args.quadlet_dir)
+        if not services:
+            print(f"No installed quadlets found in {args.quadlet_dir}")
+            return
+
+        profiles = compute_profiles(services, priority, total, reserve_mib)
+        print_report(profiles, total, reserve_mib, os.cpu_count() or 1)
+        print()
+
+        if args.dry_run:
+            return
+
+        if args.priority or args.reserve_mib is not None:
+            save_profile_config(priority, reserve)
+
+        for p in profiles:
+            path = args.quadlet_dir / f"{p.name}.container"
+            current = path.read_text()
+            updated = apply_profile(current, p.service_settings())
+            if updated != current:
+                path.write_text(updated)
+                print(f"✓ Updated {path.name}")
+            else:
+                print(f"  {path.name} unchanged")
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Restore one app's config directory from a /srv/.snapshots snapshot using reflinks.
+
+Builds a copy of <snapshot>/<app> next to the live /srv/config/<app> where
+every file is cloned with the FICLONE ioctl, so file data is shared with the
+snapshot instead of rewritten. Files that cannot be cloned (e.g. a different
+filesystem) fall back to a normal copy, and those bytes are reported as
+written. The live directory is then swapped out and kept as
+<app>.pre-restore-<timestamp> until you remove it.
+
+The app's container must be stopped while restoring; `hjust restore` does
+that and starts it again.
+
+Requirements:
+- Python 3.10+
+- Run as root (ownership of container-mapped files is preserved)
+
+Usage examples:
+  # List the snapshots that contain Sonarr's config
+  python restore_app.py list sonarr
+
+  # Restore Sonarr from a snapshot
+  sudo python restore_app.py restore sonarr config-20250101-030000
+"""
+
+import argparse
+import errno
+import fcntl
+import os
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_SNAPSHOT_DIR = "/var/srv/.snapshots"
+DEFAULT_CONFIG_DIR = "/var/srv/config"
+SNAPSHOT_PREFIX = "config-"
+
+# From <linux/fs.h>: _IOW(0x94, 9, int)
+FICLONE = 0x40049409
+# Errors meaning "cannot clone here", as opposed to a real I/O failure
+CLONE_UNSUPPORTED = {errno.EXDEV, errno.EOPNOTSUPP, errno.EINVAL, errno.ENOTTY}
+
+
+@dataclass
+class RestoreStats:
+    files: int = 0
+    cloned_bytes: int = 0
+    written_bytes: int = 0
+
+
+def snapshots_with_app(snapshot_dir: Path, app: str) -> list[Path]:
+    """Return the snapshots containing the app's directory, newest first."""
+    return sorted(
+        (p for p in snapshot_dir.glob(f"{SNAPSHOT_PREFIX}*") if (p / app).is_dir()),
+        reverse=True,
+    )
+
+
+def clone_file(src: Path, dst: Path, stats: RestoreStats) -> None:
+    size = src.stat().st_size
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            stats.cloned_bytes += size
+        except OSError as e:
+            if e.errno not in CLONE_UNSUPPORTED:
+                raise
+            shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+            stats.written_bytes += size
+    stats.files += 1
+
+
+def _copy_metadata(src: Path, dst: Path) -> None:
+    st = os.lstat(src)
+    os.chown(dst, st.st_uid, st.st_gid, follow_symlinks=False)
+    if not dst.is_symlink():
+        shutil.copystat(src, dst)
+
+
+def clone_tree(src: Path, dst: Path, stats: RestoreStats) -> None:
+    dst.mkdir()
+    for entry in sorted(src.iterdir()):
+        target = dst / entry.name
+        if entry.is_symlink():
+            target.symlink_to(os.readlink(entry))
+        elif entry.is_dir():
+            clone_tree(entry, target, stats)
+            continue
+        elif entry.is_file():
+            clone_file(entry, target, stats)
+        else:
+            # Sockets and FIFOs are recreated by the app
+            continue
+        _copy_metadata(entry, target)
+    # Directory metadata last, so adding entries does not bump its mtime
+    _copy_metadata(src, dst)
+
+
+def _fmt_bytes(n: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if n < 1024 or unit == "TiB":
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TiB"
+
+
+def cmd_list(args) -> None:
+    snapshots = snapshots_with_app(Path(args.snapshot_dir), args.app)
+    if not snapshots:
+        print(f"No snapshots in {args.snapshot_dir} contain {args.app}", file=sys.stderr)
+        sys.exit(1)
+    for snapshot in snapshots:
+        print(snapshot.name)
+
+
+def cmd_restore(args) -> None:
+    source = Path(args.snapshot_dir) / args.snapshot / args.app
+    if not source.is_dir():
+        raise RuntimeError(f"{source} does not exist")
+
+    live = Path(args.config_dir) / args.app
+    staging = live.with_name(f"{args.app}.restoring")
+    backup = live.with_name(f"{args.app}.pre-restore-{time.strftime('%Y%m%d-%H%M%S')}")
+    if staging.exists():
+        # Left over from an interrupted restore; the live directory is untouched
+        shutil.rmtree(staging)
+
+    print(f"Restoring {live} from {args.snapshot}...")
+    start = time.monotonic()
+    stats = RestoreStats()
+    clone_tree(source, staging, stats)
+
+    if live.exists():
+        live.rename(backup)
+    staging.rename(live)
+    os.sync()
+    elapsed = time.monotonic() - start
+
+    print(f"✓ Restored {stats.files} files in {elapsed:.1f}s")
+    print(
+        f"  {_fmt_bytes(stats.cloned_bytes)} shared with the snapshot (reflinked), "
+        f"{_fmt_bytes(stats.written_bytes)} written"
+    )
+    if backup.exists():
+        print(f"  Previous config kept at {backup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Restore an app's config from a btrfs snapshot with reflinks."
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        default=DEFAULT_SNAPSHOT_DIR,
+        help=f"Snapshot directory (default: {DEFAULT_SNAPSHOT_DIR})",
+    )
+    parser.add_argument(
+        "--config-dir",
+        default=DEFAULT_CONFIG_DIR,
+        help=f"Live config directory (default: {DEFAULT_CONFIG_DIR})",
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    ls = sub.add_parser("list", help="List snapshots containing the app, newest first")
+    ls.add_argument("app")
+
+    r = sub.add_parser("restore", help="Restore the app's directory from a snapshot")
+    r.add_argument("app")
+    r.add_argument("snapshot", help="Snapshot name, e.g. config-20250101-030000")
+    args = parser.parse_args()
+
+    try:
+        if args.cmd == "list":
+            cmd_list(args)
+        elif args.cmd == "restore":
+            cmd_restore(args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
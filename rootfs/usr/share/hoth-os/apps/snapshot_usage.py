@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Report how much space each /srv/config snapshot pins and prune by byte budget.
+
+Enables btrfs quota groups on the snapshot filesystem, puts every config-*
+snapshot into one level-1 qgroup and reads `btrfs qgroup show --raw`. Each
+snapshot's exclusive bytes are what deleting it alone would free; the group's
+exclusive bytes are what all snapshots pin together beyond the live
+/srv/config. Pruning deletes the snapshot that frees the most space first,
+re-measures, and repeats until the group fits the budget, never touching the
+newest snapshot or snapshots younger than the minimum age.
+
+Requirements:
+- Python 3.10+
+- btrfs-progs (run as root)
+
+Usage examples:
+  # Show exclusive and shared bytes per snapshot
+  sudo python snapshot_usage.py status
+
+  # Keep snapshots within 2 GiB, deleting nothing younger than 24 hours
+  sudo python snapshot_usage.py prune --max-bytes 2G --min-age-hours 24
+
+  # Show what would be deleted
+  sudo python snapshot_usage.py prune --max-bytes 2G --dry-run
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_SNAPSHOT_DIR = "/var/srv/.snapshots"
+SNAPSHOT_PREFIX = "config-"
+SNAPSHOT_TIME_FORMAT = "%Y%m%d-%H%M%S"
+# Level-1 qgroup collecting every config snapshot
+SNAPSHOT_QGROUP = "1/100"
+
+QGROUP_RE = re.compile(r"^(\d+/\d+)\s+(\d+)\s+(\d+)(?:\s+(\S+))?", re.MULTILINE)
+SIZE_SUFFIXES = {"K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+@dataclass
+class Snapshot:
+    name: str
+    path: Path
+    qgroup: str
+    created: datetime
+    referenced: int = 0
+    exclusive: int = 0
+
+    @property
+    def shared(self) -> int:
+        return self.referenced - self.exclusive
+
+    def age_hours(self, now: datetime) -> float:
+        return (now - self.created).total_seconds() / 3600
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().upper().removesuffix("IB").removesuffix("B")
+    if value and value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+
+def _btrfs(*args: str, check: bool = True) -> subprocess.CompletedProcess:
+    return subprocess.run(["btrfs", *args], capture_output=True, text=True, check=check)
+
+
+def list_snapshots(snapshot_dir: Path) -> list[Snapshot]:
+    """Return the config snapshots, oldest first."""
+    snapshots = []
+    for path in sorted(snapshot_dir.glob(f"{SNAPSHOT_PREFIX}*")):
+        try:
+            created = datetime.strptime(
+                path.name.removeprefix(SNAPSHOT_PREFIX), SNAPSHOT_TIME_FORMAT
+            )
+        except ValueError:
+            continue
+        rootid = _btrfs("inspect-internal", "rootid", str(path)).stdout.strip()
+        snapshots.append(Snapshot(path.name, path, f"0/{rootid}", created))
+    return sorted(snapshots, key=lambda s: s.created)
+
+
+def read_qgroups(mount: Path) -> dict[str, tuple[int, int, str]]:
+    """Map qgroup ID to (referenced, exclusive, parent)."""
+    out = _btrfs("qgroup", "show", "--raw", "-p", str(mount)).stdout
+    return {
+        m.group(1): (int(m.group(2)), int(m.group(3)), m.group(4) or "-")
+        for m in QGROUP_RE.finditer(out)
+    }
+
+
+def ensure_quota(mount: Path, snapshots: list[Snapshot]) -> dict[str, tuple[int, int, str]]:
+    """Enable quotas, group the snapshots and return up-to-date qgroup numbers."""
+    if _btrfs("qgroup", "show", str(mount), check=False).returncode != 0:
+        print(f"Enabling btrfs quotas on {mount} (first scan may take a while)...")
+        _btrfs("quota", "enable", str(mount))
+
+    qgroups = read_qgroups(mount)
+    if SNAPSHOT_QGROUP not in qgroups:
+        _btrfs("qgroup", "create", SNAPSHOT_QGROUP, str(mount))
+
+    for s in snapshots:
+        parent = qgroups.get(s.qgroup, (0, 0, "-"))[2]
+        if SNAPSHOT_QGROUP not in parent.split(","):
+            _btrfs("qgroup", "assign", "--no-rescan", s.qgroup, SNAPSHOT_QGROUP, str(mount))
+
+    return refresh(mount)
+
+
+def refresh(mount: Path) -> dict[str, tuple[int, int, str]]:
+    # Numbers are only exact once pending deletions and rescans have finished
+    _btrfs("subvolume", "sync", str(mount), check=False)
+    _btrfs("quota", "rescan", "-w", str(mount), check=False)
+    return read_qgroups(mount)
+
+
+def measure(snapshots: list[Snapshot], qgroups: dict[str, tuple[int, int, str]]) -> int:
+    """Fill in per-snapshot numbers and return the bytes pinned by all of them."""
+    for s in snapshots:
+        s.referenced, s.exclusive, _ = qgroups.get(s.qgroup, (0, 0, "-"))
+    return qgroups.get(SNAPSHOT_QGROUP, (0, 0, "-"))[1]
+
+
+def _fmt_bytes(n: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if n < 1024 or unit == "TiB":
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TiB"
+
+
+def cmd_status(args) -> None:
+    snapshot_dir = Path(args.snapshot_dir)
+    snapshots = list_snapshots(snapshot_dir)
+    if not snapshots:
+        print(f"No snapshots found in {snapshot_dir}")
+        return
+
+    pinned = measure(snapshots, ensure_quota(snapshot_dir, snapshots))
+    now = datetime.now()
+    print(f"{'Snapshot':<24}{'Age':>8}{'Referenced':>14}{'Exclusive':>14}{'Shared':>14}")
+    for s in snapshots:
+        print(
+            f"{s.name:<24}{s.age_hours(now):>7.0f}h{_fmt_bytes(s.referenced):>14}"
+            f"{_fmt_bytes(s.exclusive):>14}{_fmt_bytes(s.shared):>14}"
+        )
+    print()
+    print(f"Pinned by all {len(snapshots)} snapshots: {_fmt_bytes(pinned)}")
+    print("Exclusive = freed by deleting that snapshot alone")
+
+
+def cmd_prune(args) -> None:
+    snapshot_dir = Path(args.snapshot_dir)
+    max_bytes = parse_size(args.max_bytes)
+    snapshots = list_snapshots(snapshot_dir)
+    if not snapshots:
+        print(f"No snapshots found in {snapshot_dir}")
+        return
+
+    pinned = measure(snapshots, ensure_quota(snapshot_dir, snapshots))
+    print(f"Snapshots pin {_fmt_bytes(pinned)}, budget {_fmt_bytes(max_bytes)}")
+
+    now = datetime.now()
+    while pinned > max_bytes:
+        # The newest snapshot is the one a restore is most likely to need
+        candidates = [
+            s for s in snapshots[:-1] if s.age_hours(now) >= args.min_age_hours
+        ]
+        if not candidates:
+            print(
+                f"Over budget by {_fmt_bytes(pinned - max_bytes)}, but no snapshot "
+                f"older than {args.min_age_hours}h is left to delete"
+            )
+            return
+
+        victim = max(candidates, key=lambda s: (s.exclusive, -s.created.timestamp()))
+        if args.dry_run:
+            print(f"Would delete {victim.name} (frees ~{_fmt_bytes(victim.exclusive)})")
+            pinned -= victim.exclusive
+            snapshots.remove(victim)
+            continue
+
+        print(f"Deleting {victim.name} (frees ~{_fmt_bytes(victim.exclusive)})")
+        _btrfs("subvolume", "delete", str(victim.path))
+        _btrfs("qgroup", "destroy", victim.qgroup, str(snapshot_dir), check=False)
+        snapshots.remove(victim)
+        # Data the deleted snapshot shared may now be exclusive to its neighbours
+        pinned = measure(snapshots, refresh(snapshot_dir))
+
+    print(f"✓ Snapshots pin {_fmt_bytes(pinned)}, within budget")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Snapshot space accounting and byte-budget retention."
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        default=DEFAULT_SNAPSHOT_DIR,
+        help=f"Snapshot directory (default: {DEFAULT_SNAPSHOT_DIR})",
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("status", help="Show exclusive and shared bytes per snapshot")
+
+    p = sub.add_parser("prune", help="Delete snapshots until they fit a byte budget")
+    p.add_argument(
+        "--max-bytes", required=True, help="Budget for all snapshots, e.g. 2G or 500M"
+    )
+    p.add_argument(
+        "--min-age-hours",
+        type=float,
+        default=24,
+        help="Never delete snapshots younger than this (default: 24)",
+    )
+    p.add_argument(
+        "--dry-run", action="store_true", help="Show what would be deleted"
+    )
+    args = parser.parse_args()
+
+    try:
+        if args.cmd == "status":
+            cmd_status(args)
+        elif args.cmd == "prune":
+            cmd_prune(args)
+    except subprocess.CalledProcessError as e:
+        print(f"Error: {' '.join(e.cmd)}: {e.stderr.strip()}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,13 @@ SRV_CONFIG_DIR="/var/srv/config"
 SNAPSHOT_CONFIG_FILE="/etc/hoth-os/btrfs-snapshot.conf"
 
 DEFAULT_MAX_SNAPSHOTS=7
+DEFAULT_MIN_AGE_HOURS=24
+
+# --force takes a snapshot even if nothing changed since the last one
+FORCE=false
+if [ "${1:-}" = "--force" ]; then
+    FORCE=true
+fi
 
 if [ ! -f "$SNAPSHOT_CONFIG_FILE" ]; then
     echo "Creating default config at $SNAPSHOT_CONFIG_FILE"
@@ -23,6 +30,16 @@ if ! [[ "$MAX_SNAPSHOTS" =~ ^[0-9]+$ ]]; then
     yq e -i ".max_snapshots = $DEFAULT_MAX_SNAPSHOTS" -p ini -o ini "$SNAPSHOT_CONFIG_FILE"
 fi
 
+# retention = count keeps the last max_snapshots; retention = size deletes the
+# snapshots pinning the most space until all of them fit in max_bytes
+RETENTION=$(yq e '.retention // "count"' -p ini -o ini "$SNAPSHOT_CONFIG_FILE")
+MAX_BYTES=$(yq e '.max_bytes // ""' -p ini -o ini "$SNAPSHOT_CONFIG_FILE")
+MIN_AGE_HOURS=$(yq e ".min_age_hours // $DEFAULT_MIN_AGE_HOURS" -p ini -o ini "$SNAPSHOT_CONFIG_FILE")
+
+if [ "$RETENTION" = "size" ] && [ -z "$MAX_BYTES" ]; then
+    echo "retention = size needs max_bytes in $SNAPSHOT_CONFIG_FILE, falling back to count"
+    RETENTION="count"
+fi
 
 if [ ! -d "$SRV_CONFIG_DIR" ]; then
     echo "Error: $SRV_CONFIG_DIR does not exist"
@@ -34,21 +51,51 @@ if [ ! -d "$SNAPSHOT_DIR" ]; then
     exit 1
 fi
 
+subvolume_field() {
+    btrfs subvolume show "$1" | awk -F: -v key="$2" '{ k = $1; gsub(/^[ \t]+/, "", k) } k == key { gsub(/[ \t]/, "", $2); print $2; exit }'
+}
+
+LAST_SNAPSHOT=$(ls -1 "$SNAPSHOT_DIR" | grep "^config-" | sort -r | head -n 1 || true)
+
+if [ -n "$LAST_SNAPSHOT" ]; then
+    # Every write to @config bumps its generation; the snapshot records the
+    # generation it was taken at, so equal numbers mean nothing changed
+    CURRENT_GEN=$(subvolume_field "$SRV_CONFIG_DIR" "Generation")
+    LAST_GEN=$(subvolume_field "$SNAPSHOT_DIR/$LAST_SNAPSHOT" "Gen at creation")
+
+    if [ "$CURRENT_GEN" -le "$LAST_GEN" ] && [ "$FORCE" = false ]; then
+        echo "No changes since $LAST_SNAPSHOT (generation $CURRENT_GEN), skipping snapshot"
+        exit 0
+    fi
+
+    # find-new lists file data written after the given generation; deletes
+    # and renames only show up in the generation number
+    CHANGED_APPS=$(btrfs subvolume find-new "$SRV_CONFIG_DIR" $((LAST_GEN + 1)) \
+        | sed -n 's/^inode .* flags [^ ]* \([^/]*\).*/\1/p' | sort -u | paste -sd ' ' -)
+    echo "Changed since $LAST_SNAPSHOT (generation $LAST_GEN -> $CURRENT_GEN): ${CHANGED_APPS:-metadata only}"
+fi
+
 TIMESTAMP=$(date +%Y%m%d-%H%M%S)
 SNAPSHOT_NAME="config-$TIMESTAMP"
 
 echo "Creating snapshot: $SNAPSHOT_NAME"
-btrfs subvolume snapshot -r "$CONFIG_DIR" "$SNAPSHOT_DIR/$SNAPSHOT_NAME"
+btrfs subvolume snapshot -r "$SRV_CONFIG_DIR" "$SNAPSHOT_DIR/$SNAPSHOT_NAME"
 
-echo "Cleaning up old snapshots (keeping last $MAX_SNAPSHOTS)..."
-SNAPSHOTS=$(ls -1 "$SNAPSHOT_DIR" | grep "^config-" | sort -r)
-SNAPSHOT_COUNT=$(echo "$SNAPSHOTS" | wc -l)
+if [ "$RETENTION" = "size" ]; then
+    echo "Cleaning up snapshots (budget $MAX_BYTES, minimum age ${MIN_AGE_HOURS}h)..."
+    python3 /usr/share/hoth-os/apps/snapshot_usage.py --snapshot-dir "$SNAPSHOT_DIR" \
+        prune --max-bytes "$MAX_BYTES" --min-age-hours "$MIN_AGE_HOURS"
+else
+    echo "Cleaning up old snapshots (keeping last $MAX_SNAPSHOTS)..."
+    SNAPSHOTS=$(ls -1 "$SNAPSHOT_DIR" | grep "^config-" | sort -r)
+    SNAPSHOT_COUNT=$(echo "$SNAPSHOTS" | wc -l)
 
-if [ "$SNAPSHOT_COUNT" -gt "$MAX_SNAPSHOTS" ]; then
-    echo "$SNAPSHOTS" | tail -n +$((MAX_SNAPSHOTS + 1)) | while read -r old_snapshot; do
-        echo "Deleting old snapshot: $old_snapshot"
-        btrfs subvolume delete "$SNAPSHOT_DIR/$old_snapshot"
-    done
+    if [ "$SNAPSHOT_COUNT" -gt "$MAX_SNAPSHOTS" ]; then
+        echo "$SNAPSHOTS" | tail -n +$((MAX_SNAPSHOTS + 1)) | while read -r old_snapshot; do
+            echo "Deleting old snapshot: $old_snapshot"
+            btrfs subvolume delete "$SNAPSHOT_DIR/$old_snapshot"
+        done
+    fi
 fi
 
 echo "Snapshot created successfully: $SNAPSHOT_NAME"